@@ -11,6 +11,20 @@ class Settings(BaseSettings):
         "DATABASE_URL", 
         "postgresql://postgres:postgres@db:5432/forum"
     )
+    # Defaults to DATABASE_URL with its async driver (asyncpg / aiosqlite)
+    ASYNC_DATABASE_URL: str = os.getenv("ASYNC_DATABASE_URL", "")
+    
+    # Apply pending Alembic migrations when the app starts
+    RUN_MIGRATIONS_ON_STARTUP: bool = os.getenv("RUN_MIGRATIONS_ON_STARTUP", "True") == "True"
+    
+    # Connection pool, per engine and worker. DB_POOL_MODE=null opens a
+    # connection per checkout, for use behind an external pooler (PgBouncer)
+    DB_POOL_MODE: str = os.getenv("DB_POOL_MODE", "queue")
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "True") == "True"
     
     # Redis
     REDIS_HOST: str = os.getenv("REDIS_HOST", "redis")
@@ -22,6 +36,42 @@ class Settings(BaseSettings):
     RABBITMQ_USER: str = os.getenv("RABBITMQ_USER", "guest")
     RABBITMQ_PASS: str = os.getenv("RABBITMQ_PASS", "guest")
     
+    # Search text analysis (changing these invalidates saved snapshots)
+    SEARCH_STOPWORDS: bool = os.getenv("SEARCH_STOPWORDS", "True") == "True"
+    SEARCH_STEMMING: bool = os.getenv("SEARCH_STEMMING", "True") == "True"
+    
+    # Topic views are buffered in Redis and written to Postgres this often
+    VIEW_FLUSH_INTERVAL_SECONDS: int = int(os.getenv("VIEW_FLUSH_INTERVAL_SECONDS", "10"))
+    
+    # Topic comment counters are checked against the comments table this often
+    COUNTER_RECONCILE_INTERVAL_SECONDS: int = int(os.getenv("COUNTER_RECONCILE_INTERVAL_SECONDS", "3600"))
+    
+    # Trending: views and comments count less the older they are
+    TRENDING_HALF_LIFE_HOURS: float = float(os.getenv("TRENDING_HALF_LIFE_HOURS", "6"))
+    TRENDING_COMMENT_WEIGHT: float = float(os.getenv("TRENDING_COMMENT_WEIGHT", "5"))
+    
+    # Search index snapshot (0 disables periodic saving)
+    SEARCH_SNAPSHOT_PATH: str = os.getenv("SEARCH_SNAPSHOT_PATH", "data/search_index.snapshot")
+    SEARCH_SNAPSHOT_INTERVAL_SECONDS: int = int(os.getenv("SEARCH_SNAPSHOT_INTERVAL_SECONDS", "300"))
+    
+    # Share index mutations between workers over Redis pub/sub
+    SEARCH_CHANGE_FEED: bool = os.getenv("SEARCH_CHANGE_FEED", "True") == "True"
+    
+    # Topics fetched and indexed per batch while bootstrapping the search index
+    SEARCH_BOOTSTRAP_BATCH_SIZE: int = int(os.getenv("SEARCH_BOOTSTRAP_BATCH_SIZE", "1000"))
+    
+    # GraphQL list fields return pages of this size, and never more than the max
+    GRAPHQL_DEFAULT_PAGE_SIZE: int = int(os.getenv("GRAPHQL_DEFAULT_PAGE_SIZE", "20"))
+    GRAPHQL_MAX_PAGE_SIZE: int = int(os.getenv("GRAPHQL_MAX_PAGE_SIZE", "100"))
+    
+    # GraphQL documents nested deeper or costing more than this are rejected
+    # before execution (cost: objects the document can return, see extensions.py)
+    GRAPHQL_MAX_DEPTH: int = int(os.getenv("GRAPHQL_MAX_DEPTH", "10"))
+    GRAPHQL_MAX_COST: int = int(os.getenv("GRAPHQL_MAX_COST", "5000"))
+    
+    # Parsed and validated GraphQL documents (and persisted queries) kept per worker
+    GRAPHQL_DOCUMENT_CACHE_SIZE: int = int(os.getenv("GRAPHQL_DOCUMENT_CACHE_SIZE", "500"))
+    
     # JWT Authentication
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-for-jwt")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
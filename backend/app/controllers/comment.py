@@ -1,7 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from app.models import get_db
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import List, Optional
+from app.models import get_async_db, refresh_with
 from app.models.comment import Comment
 from app.models.topic import Topic
 from app.models.notification import Notification
@@ -9,17 +12,32 @@ from app.schema_validation.comment import CommentCreate, Comment as CommentSchem
 from app.services.auth_service import get_current_user
 from app.models.user import User
 from app.services.notification_service import publish_notification
+from app.services.pubsub import comments_channel, live_updates
+from app.services.search_service import search_service
+from app.utils.pagination import Cursor, cursor_param, keyset_page, keyset_query, set_page_headers
 
 router = APIRouter()
 
+def _adjust_topic_counters(topic_id: int, delta: int):
+    # One atomic UPDATE in the comment's transaction; updated_at is kept so
+    # the topic doesn't look edited
+    topics = Topic.__table__
+    values = {
+        "comments_count": topics.c.comments_count + delta,
+        "updated_at": topics.c.updated_at
+    }
+    if delta > 0:
+        values["last_activity_at"] = func.now()
+    return update(topics).where(topics.c.id == topic_id).values(**values)
+
 @router.post("/", response_model=CommentSchema)
-def create_comment(
+async def create_comment(
     comment: CommentCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     # Check if topic exists
-    topic = db.query(Topic).filter(Topic.id == comment.topic_id).first()
+    topic = await db.get(Topic, comment.topic_id)
     if not topic:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -33,8 +51,21 @@ def create_comment(
         user_id=current_user.id
     )
     db.add(db_comment)
-    db.commit()
-    db.refresh(db_comment)
+    await db.execute(_adjust_topic_counters(comment.topic_id, 1))
+    await db.commit()
+    await refresh_with(db, db_comment, "user")
+    
+    # Add to search index
+    await run_in_threadpool(search_service.add_comment, db_comment)
+    
+    # Push to live subscribers of the thread
+    await live_updates.publish(comments_channel(db_comment.topic_id), {
+        "id": db_comment.id,
+        "content": db_comment.content,
+        "user_id": db_comment.user_id,
+        "topic_id": db_comment.topic_id,
+        "created_at": db_comment.created_at.isoformat()
+    })
     
     # Create notification for topic author
     if topic.user_id != current_user.id:
@@ -45,11 +76,11 @@ def create_comment(
             comment_id=db_comment.id
         )
         db.add(notification)
-        db.commit()
-        db.refresh(notification)
+        await db.commit()
+        await db.refresh(notification)
         
         # Publish real-time notification
-        publish_notification(topic.user_id, {
+        await run_in_threadpool(publish_notification, topic.user_id, {
             "id": notification.id,
             "message": notification.message,
             "topic_id": notification.topic_id,
@@ -61,14 +92,17 @@ def create_comment(
     return db_comment
 
 @router.get("/topic/{topic_id}", response_model=List[CommentSchema])
-def get_topic_comments(
+async def get_topic_comments(
     topic_id: int,
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 50,
-    db: Session = Depends(get_db)
+    cursor: Optional[Cursor] = Depends(cursor_param),
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Check if topic exists
-    topic = db.query(Topic).filter(Topic.id == topic_id).first()
+    topic = await db.get(Topic, topic_id)
     if not topic:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -76,23 +110,32 @@ def get_topic_comments(
         )
     
     # Get comments
-    comments = db.query(Comment).filter(
+    query = select(Comment).where(
         Comment.topic_id == topic_id
-    ).order_by(
-        Comment.created_at.asc()
-    ).offset(skip).limit(limit).all()
+    ).options(
+        selectinload(Comment.user)
+    )
+    if skip and cursor is None:
+        # Legacy offset paging
+        result = await db.execute(query.order_by(Comment.created_at.asc()).offset(skip).limit(limit))
+        return result.scalars().all()
+    
+    # Keyset paging, oldest first
+    result = await db.execute(keyset_query(query, Comment.created_at, Comment.id, cursor, limit))
+    comments, next_cursor, prev_cursor = keyset_page(result.scalars().all(), cursor, limit)
+    set_page_headers(response, request, next_cursor, prev_cursor)
     
     return comments
 
 @router.put("/{comment_id}", response_model=CommentSchema)
-def update_comment(
+async def update_comment(
     comment_id: int,
     comment_update: CommentUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     # Get comment
-    db_comment = db.query(Comment).filter(Comment.id == comment_id).first()
+    db_comment = await db.get(Comment, comment_id)
     if not db_comment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -107,22 +150,33 @@ def update_comment(
         )
     
     # Update comment
+    old_content = db_comment.content
     if comment_update.content:
         db_comment.content = comment_update.content
     
-    db.commit()
-    db.refresh(db_comment)
+    await db.commit()
+    await refresh_with(db, db_comment, "user")
+    
+    # Update in search index
+    await run_in_threadpool(search_service.update_comment, db_comment, old_content)
     
     return db_comment
 
 @router.delete("/{comment_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_comment(
+async def delete_comment(
     comment_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    # Get comment
-    db_comment = db.query(Comment).filter(Comment.id == comment_id).first()
+    # Get comment (with the notifications whose link the delete clears)
+    result = await db.execute(
+        select(Comment).where(
+            Comment.id == comment_id
+        ).options(
+            selectinload(Comment.notifications)
+        )
+    )
+    db_comment = result.scalars().first()
     if not db_comment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -137,7 +191,11 @@ def delete_comment(
         )
     
     # Delete comment
-    db.delete(db_comment)
-    db.commit()
+    await db.delete(db_comment)
+    await db.execute(_adjust_topic_counters(db_comment.topic_id, -1))
+    await db.commit()
+    
+    # Remove from search index
+    await run_in_threadpool(search_service.remove_comment, db_comment)
     
     return
\ No newline at end of file
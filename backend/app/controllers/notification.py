@@ -1,15 +1,17 @@
-from fastapi import WebSocket, WebSocketDisconnect, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from typing import List, Dict
+from fastapi import WebSocket, WebSocketDisconnect, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Dict, Optional
 import json
 import redis
 import asyncio
-from app.models import get_db
+from app.models import get_async_db
 from app.models.notification import Notification
 from app.schema_validation.notification import Notification as NotificationSchema
 from app.services.auth_service import get_current_user
 from app.models.user import User
 from app.config import settings
+from app.utils.pagination import Cursor, cursor_param, keyset_page, keyset_query, set_page_headers
 from jose import JWTError, jwt
 from fastapi import APIRouter
 
@@ -26,31 +28,46 @@ redis_client = redis.Redis(
 active_connections: Dict[int, List[WebSocket]] = {}
 
 @router.get("/", response_model=List[NotificationSchema])
-def get_notifications(
+async def get_notifications(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 20,
-    db: Session = Depends(get_db),
+    cursor: Optional[Cursor] = Depends(cursor_param),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    notifications = db.query(Notification).filter(
+    query = select(Notification).where(
         Notification.user_id == current_user.id
-    ).order_by(
-        Notification.created_at.desc()
-    ).offset(skip).limit(limit).all()
+    )
+    if skip and cursor is None:
+        # Legacy offset paging
+        result = await db.execute(query.order_by(Notification.created_at.desc()).offset(skip).limit(limit))
+        return result.scalars().all()
+    
+    # Keyset paging, newest first
+    result = await db.execute(
+        keyset_query(query, Notification.created_at, Notification.id, cursor, limit, descending=True)
+    )
+    notifications, next_cursor, prev_cursor = keyset_page(result.scalars().all(), cursor, limit)
+    set_page_headers(response, request, next_cursor, prev_cursor)
     
     return notifications
 
 @router.put("/{notification_id}/read", response_model=NotificationSchema)
-def mark_notification_as_read(
+async def mark_notification_as_read(
     notification_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     # Get notification
-    notification = db.query(Notification).filter(
-        Notification.id == notification_id,
-        Notification.user_id == current_user.id
-    ).first()
+    result = await db.execute(
+        select(Notification).where(
+            Notification.id == notification_id,
+            Notification.user_id == current_user.id
+        )
+    )
+    notification = result.scalars().first()
     
     if not notification:
         raise HTTPException(
@@ -60,25 +77,27 @@ def mark_notification_as_read(
     
     # Mark as read
     notification.is_read = True
-    db.commit()
-    db.refresh(notification)
+    await db.commit()
+    await db.refresh(notification)
     
     return notification
 
 @router.put("/read-all", status_code=status.HTTP_204_NO_CONTENT)
-def mark_all_notifications_as_read(
-    db: Session = Depends(get_db),
+async def mark_all_notifications_as_read(
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     # Update all unread notifications
-    db.query(Notification).filter(
-        Notification.user_id == current_user.id,
-        Notification.is_read == False
-    ).update(
-        {"is_read": True}
+    await db.execute(
+        update(Notification).where(
+            Notification.user_id == current_user.id,
+            Notification.is_read == False
+        ).values(
+            is_read=True
+        )
     )
     
-    db.commit()
+    await db.commit()
     
     return
 
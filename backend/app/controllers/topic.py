@@ -1,21 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from typing import List
-from app.models import get_db
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import List, Optional
+from app.models import get_async_db, refresh_with
 from app.models.topic import Topic
 from app.models.comment import Comment
-from app.schema_validation.topic import TopicCreate, Topic as TopicSchema, TopicDetail, TopicUpdate
+from app.schema_validation.topic import TopicCreate, Topic as TopicSchema, TopicDetail, TopicUpdate, TopicSearchResult
 from app.services.auth_service import get_current_user
 from app.models.user import User
-from app.services.search_service import search_service
-from sqlalchemy import func
+from app.services.search_service import search_service, make_snippet
+from app.services.view_counter import view_counter
+from app.utils.pagination import Cursor, cursor_param, keyset_page, keyset_query, set_page_headers
 
 router = APIRouter()
 
 @router.post("/", response_model=TopicSchema)
-def create_topic(
+async def create_topic(
     topic: TopicCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     # Create new topic
@@ -25,36 +29,41 @@ def create_topic(
         user_id=current_user.id
     )
     db.add(db_topic)
-    db.commit()
-    db.refresh(db_topic)
+    await db.commit()
+    await refresh_with(db, db_topic, "user")
     
     # Add to search index
-    search_service.add_topic(db_topic)
+    await run_in_threadpool(search_service.add_topic, db_topic)
     
     return db_topic
 
 @router.get("/", response_model=List[TopicDetail])
-def get_topics(
+async def get_topics(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 10,
-    db: Session = Depends(get_db)
+    cursor: Optional[Cursor] = Depends(cursor_param),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    # Get topics with comment count
-    topics = db.query(
-        Topic,
-        func.count(Comment.id).label('comments_count')
-    ).outerjoin(
-        Comment, 
-        Topic.id == Comment.topic_id
-    ).group_by(
-        Topic.id
-    ).order_by(
-        Topic.created_at.desc()
-    ).offset(skip).limit(limit).all()
+    # Get topics (comments_count is a maintained column, no aggregation needed)
+    query = select(Topic).options(selectinload(Topic.user))
+    if skip and cursor is None:
+        # Legacy offset paging
+        result = await db.execute(query.order_by(Topic.created_at.desc()).offset(skip).limit(limit))
+        topics = result.scalars().all()
+    else:
+        # Keyset paging, newest first
+        result = await db.execute(keyset_query(query, Topic.created_at, Topic.id, cursor, limit, descending=True))
+        topics, next_cursor, prev_cursor = keyset_page(result.scalars().all(), cursor, limit)
+        set_page_headers(response, request, next_cursor, prev_cursor)
+    
+    # Include views not yet flushed to the database
+    pending_views = await run_in_threadpool(view_counter.pending, [topic.id for topic in topics])
     
     # Convert to schema format
     results = []
-    for topic, comments_count in topics:
+    for topic in topics:
         # Convert to schema format
         topic_dict = {
             "id": topic.id,
@@ -63,64 +72,105 @@ def get_topics(
             "user_id": topic.user_id,
             "created_at": topic.created_at,
             "updated_at": topic.updated_at,
-            "view_count": topic.view_count,
+            "view_count": (topic.view_count or 0) + pending_views.get(topic.id, 0),
             "user": topic.user,
-            "comments_count": comments_count
+            "comments_count": topic.comments_count,
+            "last_activity_at": topic.last_activity_at
         }
         results.append(topic_dict)
     
     return results
 
 @router.get("/trending", response_model=List[dict])
-def get_trending_topics():
-    return search_service.get_trending_topics(limit=10)
+async def get_trending_topics():
+    return await run_in_threadpool(search_service.get_trending_topics, limit=10)
+
+@router.get("/suggest", response_model=List[dict])
+async def suggest_topics(
+    prefix: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=10)
+):
+    return await run_in_threadpool(search_service.suggest, prefix, limit=limit)
 
-@router.get("/search", response_model=List[TopicSchema])
-def search_topics(
+@router.get("/search/status", response_model=dict)
+async def search_status():
+    return search_service.status()
+
+@router.get("/search", response_model=List[TopicSearchResult])
+async def search_topics(
     query: str = Query(..., min_length=1),
-    db: Session = Depends(get_db)
+    mode: str = Query("or", pattern="^(and|or)$"),
+    limit: int = Query(10, ge=1, le=100),
+    fuzzy: bool = False,
+    include_comments: bool = False,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    # Search topics
-    topic_ids = search_service.search(query)
-    if not topic_ids:
+    # Search topics (IDs come back ranked by relevance)
+    if include_comments:
+        hits = await run_in_threadpool(search_service.search_with_comments, query, limit=limit, mode=mode, fuzzy=fuzzy)
+    else:
+        topic_ids = await run_in_threadpool(search_service.search, query, limit=limit, mode=mode, fuzzy=fuzzy)
+        hits = [(topic_id, None) for topic_id in topic_ids]
+    if not hits:
         return []
     
-    # Get topics from database
-    topics = db.query(Topic).filter(Topic.id.in_(topic_ids)).all()
-    return topics
+    # Get topics (and matching comments) from database, preserving the ranking order
+    topic_ids = [topic_id for topic_id, _ in hits]
+    result = await db.execute(
+        select(Topic).where(Topic.id.in_(topic_ids)).options(selectinload(Topic.user))
+    )
+    topics_by_id = {topic.id: topic for topic in result.scalars()}
+    comment_ids = [comment_id for _, comment_id in hits if comment_id]
+    comments_by_id = {}
+    if comment_ids:
+        comments = await db.execute(select(Comment.id, Comment.content).where(Comment.id.in_(comment_ids)))
+        comments_by_id = {comment_id: content for comment_id, content in comments}
+    
+    pending_views = await run_in_threadpool(view_counter.pending, list(topics_by_id))
+    
+    results = []
+    for topic_id, comment_id in hits:
+        topic = topics_by_id.get(topic_id)
+        if not topic:
+            continue
+        matching_comment = None
+        if comment_id in comments_by_id:
+            matching_comment = {
+                "id": comment_id,
+                "snippet": make_snippet(comments_by_id[comment_id], query)
+            }
+        results.append({
+            "id": topic.id,
+            "title": topic.title,
+            "content": topic.content,
+            "user_id": topic.user_id,
+            "created_at": topic.created_at,
+            "updated_at": topic.updated_at,
+            "view_count": (topic.view_count or 0) + pending_views.get(topic.id, 0),
+            "user": topic.user,
+            "matching_comment": matching_comment
+        })
+    return results
 
 @router.get("/{topic_id}", response_model=TopicDetail)
-def get_topic(
+async def get_topic(
     topic_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    # Get topic with comment count
-    result = db.query(
-        Topic,
-        func.count(Comment.id).label('comments_count')
-    ).outerjoin(
-        Comment, 
-        Topic.id == Comment.topic_id
-    ).filter(
-        Topic.id == topic_id
-    ).group_by(
-        Topic.id
-    ).first()
-    
-    if not result:
+    # Get topic (with its maintained comment count)
+    topic = await db.get(Topic, topic_id, options=[selectinload(Topic.user)])
+    
+    if not topic:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Topic not found"
         )
     
-    topic, comments_count = result
-    
-    # Increment view count
-    topic.view_count += 1
-    db.commit()
+    # Count the view in Redis; the flusher writes it to the database later
+    pending_views = await run_in_threadpool(view_counter.record, topic_id)
     
     # Update in search service
-    search_service.increment_topic_view(topic_id)
+    await run_in_threadpool(search_service.increment_topic_view, topic_id)
     
     # Convert to schema format
     topic_dict = {
@@ -130,22 +180,23 @@ def get_topic(
         "user_id": topic.user_id,
         "created_at": topic.created_at,
         "updated_at": topic.updated_at,
-        "view_count": topic.view_count,
+        "view_count": (topic.view_count or 0) + pending_views,
         "user": topic.user,
-        "comments_count": comments_count
+        "comments_count": topic.comments_count,
+        "last_activity_at": topic.last_activity_at
     }
     
     return topic_dict
 
 @router.put("/{topic_id}", response_model=TopicSchema)
-def update_topic(
+async def update_topic(
     topic_id: int,
     topic_update: TopicUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     # Get topic
-    db_topic = db.query(Topic).filter(Topic.id == topic_id).first()
+    db_topic = await db.get(Topic, topic_id)
     if not db_topic:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -165,22 +216,30 @@ def update_topic(
     if topic_update.content:
         db_topic.content = topic_update.content
     
-    db.commit()
-    db.refresh(db_topic)
+    await db.commit()
+    await refresh_with(db, db_topic, "user")
     
     # Update in search index
-    search_service.add_topic(db_topic)
+    await run_in_threadpool(search_service.update_topic, db_topic)
     
     return db_topic
 
 @router.delete("/{topic_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_topic(
+async def delete_topic(
     topic_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    # Get topic
-    db_topic = db.query(Topic).filter(Topic.id == topic_id).first()
+    # Get topic, with everything the delete cascades to or unlinks
+    result = await db.execute(
+        select(Topic).where(
+            Topic.id == topic_id
+        ).options(
+            selectinload(Topic.comments).selectinload(Comment.notifications),
+            selectinload(Topic.notifications)
+        )
+    )
+    db_topic = result.scalars().first()
     if not db_topic:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -194,8 +253,16 @@ def delete_topic(
             detail="Not authorized to delete this topic"
         )
     
-    # Delete topic
-    db.delete(db_topic)
-    db.commit()
+    # Delete topic (its comments go with it)
+    comments = list(db_topic.comments)
+    await db.delete(db_topic)
+    await db.commit()
+    
+    # Remove from search index
+    def unindex():
+        for comment in comments:
+            search_service.remove_comment(comment)
+        search_service.remove_topic(topic_id)
+    await run_in_threadpool(unindex)
     
     return
\ No newline at end of file
@@ -1,6 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.models import get_db
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import get_async_db
 from app.models.user import User
 from app.schema_validation.user import UserCreate, User as UserSchema, UserUpdate, Token
 from app.services.auth_service import (
@@ -15,9 +17,10 @@ from app.config import settings
 router = APIRouter()
 
 @router.post("/", response_model=UserSchema)
-def create_user(user: UserCreate, db: Session = Depends(get_db)):
+async def create_user(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
     # Check if user exists
-    db_user = db.query(User).filter(User.email == user.email).first()
+    result = await db.execute(select(User).where(User.email == user.email))
+    db_user = result.scalars().first()
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -25,20 +28,20 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Create new user
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await run_in_threadpool(get_password_hash, user.password)
     db_user = User(
         username=user.username,
         email=user.email,
         hashed_password=hashed_password
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return db_user
 
 @router.post("/login", response_model=Token)
-def login(user_credentials: dict, db: Session = Depends(get_db)):
-    user = authenticate_user(db, user_credentials.get("email"), user_credentials.get("password"))
+async def login(user_credentials: dict, db: AsyncSession = Depends(get_async_db)):
+    user = await authenticate_user(db, user_credentials.get("email"), user_credentials.get("password"))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -54,14 +57,14 @@ def login(user_credentials: dict, db: Session = Depends(get_db)):
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.get("/me", response_model=UserSchema)
-def get_user_me(current_user: User = Depends(get_current_user)):
+async def get_user_me(current_user: User = Depends(get_current_user)):
     return current_user
 
 @router.put("/me", response_model=UserSchema)
-def update_user_me(
+async def update_user_me(
     user_update: UserUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Update user
     if user_update.username:
@@ -71,13 +74,13 @@ def update_user_me(
     if user_update.bio:
         current_user.bio = user_update.bio
     
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
+    await db.refresh(current_user)
     return current_user
 
 @router.get("/{user_id}", response_model=UserSchema)
-def get_user(user_id: int, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == user_id).first()
+async def get_user(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
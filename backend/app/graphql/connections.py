@@ -0,0 +1,81 @@
+import strawberry
+from typing import Callable, Generic, List, NamedTuple, Optional, Sequence, TypeVar
+from app.config import settings
+from app.utils.pagination import Cursor, decode_cursor, encode_cursor, keyset_page
+
+T = TypeVar("T")
+
+# Relay connection types; strawberry names them per node (TopicConnection, TopicEdge, ...)
+@strawberry.type
+class PageInfo:
+    has_next_page: bool
+    has_previous_page: bool
+    start_cursor: Optional[str] = None
+    end_cursor: Optional[str] = None
+
+@strawberry.type
+class Edge(Generic[T]):
+    node: T
+    cursor: str
+
+@strawberry.type
+class Connection(Generic[T]):
+    edges: List[Edge[T]]
+    page_info: PageInfo
+
+class PageRequest(NamedTuple):
+    """A validated page of a (created_at, id) keyset listing; hashable, so usable in loader keys"""
+    cursor: Optional[Cursor]
+    limit: int
+
+def page_request(
+    first: Optional[int] = None,
+    after: Optional[str] = None,
+    last: Optional[int] = None,
+    before: Optional[str] = None
+) -> PageRequest:
+    """
+    Map Relay arguments onto a keyset page. `first`/`after` page forwards,
+    `last`/`before` backwards from a cursor; the size defaults to
+    GRAPHQL_DEFAULT_PAGE_SIZE and is capped at GRAPHQL_MAX_PAGE_SIZE.
+    Raises ValueError (reported as a GraphQL error) on bad arguments.
+    """
+    if first is not None and last is not None:
+        raise ValueError("Pass either first or last, not both")
+    if after is not None and before is not None:
+        raise ValueError("Pass either after or before, not both")
+    if (first is not None and before is not None) or (last is not None and after is not None):
+        raise ValueError("Use first with after, and last with before")
+    if last is not None and before is None:
+        raise ValueError("last needs a before cursor")
+
+    size = first if first is not None else last
+    if size is None:
+        size = settings.GRAPHQL_DEFAULT_PAGE_SIZE
+    if size < 0:
+        raise ValueError("Page size can't be negative")
+    size = min(size, settings.GRAPHQL_MAX_PAGE_SIZE)
+
+    cursor = None
+    if after is not None:
+        cursor = decode_cursor(after)._replace(before=False)
+    elif before is not None:
+        cursor = decode_cursor(before)._replace(before=True)
+    return PageRequest(cursor, size)
+
+def build_connection(rows: Sequence, page: PageRequest, node: Callable) -> Connection:
+    """Connection for the rows of a keyset_query / keyset_window page, converting each with `node`"""
+    rows, next_token, prev_token = keyset_page(rows, page.cursor, page.limit)
+    edges = [
+        Edge(node=node(row), cursor=encode_cursor(Cursor(row.created_at, row.id)))
+        for row in rows
+    ]
+    return Connection(
+        edges=edges,
+        page_info=PageInfo(
+            has_next_page=next_token is not None,
+            has_previous_page=prev_token is not None,
+            start_cursor=edges[0].cursor if edges else None,
+            end_cursor=edges[-1].cursor if edges else None
+        )
+    )
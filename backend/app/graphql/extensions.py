@@ -0,0 +1,242 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Set, Tuple
+from graphql import (
+    ExecutionResult as GraphQLExecutionResult,
+    FieldNode,
+    FragmentDefinitionNode,
+    GraphQLError,
+    InlineFragmentNode,
+    SelectionSetNode,
+    get_named_type,
+    get_operation_ast,
+)
+from graphql.execution.values import get_argument_values
+from strawberry.extensions import SchemaExtension
+from strawberry.fastapi import GraphQLRouter
+from strawberry.http import GraphQLRequestData
+from strawberry.http.exceptions import HTTPException
+from strawberry.types import ExecutionResult
+from app.config import settings
+
+# Cost analysis
+
+class QueryCostLimiter(SchemaExtension):
+    """
+    Reject operations nested deeper than GRAPHQL_MAX_DEPTH or costing more
+    than GRAPHQL_MAX_COST before any resolver runs.
+
+    The cost is the number of objects the operation can return: every
+    field with a selection set counts one per parent object, and the
+    selections under a paginated field (one taking `first`/`last`) count
+    once per item of the page, sized the way page_request will size it.
+    The check walks the (cached) document with the request's variables,
+    so it is static but exact about page sizes. Pass the class, not an
+    instance.
+    """
+
+    def on_execute(self):
+        context = self.execution_context
+        operation = get_operation_ast(context.graphql_document, context.operation_name)
+        root_type = operation and context.schema._schema.get_root_type(operation.operation)
+        if root_type is not None:
+            fragments = {
+                definition.name.value: definition
+                for definition in context.graphql_document.definitions
+                if isinstance(definition, FragmentDefinitionNode)
+            }
+            depth, cost = self.measure(root_type, operation.selection_set, fragments, set())
+            error = None
+            if depth > settings.GRAPHQL_MAX_DEPTH:
+                error = f"Query depth {depth} exceeds the limit of {settings.GRAPHQL_MAX_DEPTH}"
+            elif cost > settings.GRAPHQL_MAX_COST:
+                error = f"Query cost {cost} exceeds the limit of {settings.GRAPHQL_MAX_COST}"
+            if error:
+                # A result set before execution makes strawberry skip it
+                context.result = GraphQLExecutionResult(data=None, errors=[GraphQLError(error, operation)])
+        yield
+
+    def measure(self, parent_type, selection_set: SelectionSetNode, fragments, seen: Set[str]) -> Tuple[int, int]:
+        """(depth, cost) of a selection set, per object of parent_type"""
+        schema = self.execution_context.schema._schema
+        depth = cost = 0
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                if selection.selection_set is None:
+                    continue
+                field = getattr(parent_type, "fields", {}).get(selection.name.value)
+                if field is None:
+                    continue
+                child_depth, child_cost = self.measure(
+                    get_named_type(field.type), selection.selection_set, fragments, seen
+                )
+                depth = max(depth, child_depth + 1)
+                cost += 1 + self.page_size(field, selection) * child_cost
+                continue
+
+            if isinstance(selection, InlineFragmentNode):
+                fragment = selection
+            else:
+                # Validation has already rejected unknown and cyclic fragments
+                name = selection.name.value
+                fragment = fragments.get(name)
+                if fragment is None or name in seen:
+                    continue
+                seen = seen | {name}
+            fragment_type = parent_type
+            if fragment.type_condition is not None:
+                fragment_type = schema.get_type(fragment.type_condition.name.value)
+            child_depth, child_cost = self.measure(fragment_type, fragment.selection_set, fragments, seen)
+            depth, cost = max(depth, child_depth), cost + child_cost
+        return depth, cost
+
+    def page_size(self, field, node: FieldNode) -> int:
+        """How many items a paginated field can return (1 for other fields)"""
+        if "first" not in field.args and "last" not in field.args:
+            return 1
+        try:
+            arguments = get_argument_values(field, node, self.execution_context.variables)
+        except GraphQLError:
+            # Bad variables: execution reports them, assume the worst meanwhile
+            return settings.GRAPHQL_MAX_PAGE_SIZE
+        size = arguments.get("first")
+        if size is None:
+            size = arguments.get("last")
+        if size is None:
+            return settings.GRAPHQL_DEFAULT_PAGE_SIZE
+        if not isinstance(size, int):
+            return settings.GRAPHQL_MAX_PAGE_SIZE
+        return max(0, min(size, settings.GRAPHQL_MAX_PAGE_SIZE))
+
+# Document cache and persisted queries
+
+class CachedDocument:
+    """A query's text, parsed document and validation errors once known"""
+
+    def __init__(self, query: str):
+        self.query = query
+        self.document = None
+        self.errors: Optional[List[GraphQLError]] = None
+
+class DocumentStore:
+    """
+    Per-worker LRU of GraphQL documents, keyed by the sha256 of their
+    text, which is also the hash clients send for persisted queries.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def hash(query: str) -> str:
+        return hashlib.sha256(query.encode("utf-8")).hexdigest()
+
+    def get(self, query_hash: str) -> Optional[CachedDocument]:
+        with self._lock:
+            entry = self._entries.get(query_hash)
+            if entry is not None:
+                self._entries.move_to_end(query_hash)
+            return entry
+
+    def add(self, query_hash: str, query: str) -> CachedDocument:
+        with self._lock:
+            entry = self._entries.get(query_hash)
+            if entry is None:
+                entry = self._entries[query_hash] = CachedDocument(query)
+                if len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+            else:
+                self._entries.move_to_end(query_hash)
+            return entry
+
+documents = DocumentStore(settings.GRAPHQL_DOCUMENT_CACHE_SIZE)
+
+class DocumentCache(SchemaExtension):
+    """
+    Reuse the parsed document and validation result of queries seen
+    before, so repeated queries skip parsing and validation. Only
+    documents that parse are cached. Pass the class, not an instance: it
+    keeps per-operation state.
+    """
+
+    def on_parse(self):
+        context = self.execution_context
+        query_hash = DocumentStore.hash(context.query)
+        self.entry = documents.get(query_hash)
+        if self.entry is not None and self.entry.document is not None:
+            context.graphql_document = self.entry.document
+        yield
+        if context.graphql_document is not None:
+            if self.entry is None:
+                self.entry = documents.add(query_hash, context.query)
+            self.entry.document = context.graphql_document
+
+    def on_validate(self):
+        context = self.execution_context
+        entry = getattr(self, "entry", None)
+        if entry is not None and entry.errors is not None:
+            # Non-None errors tell strawberry that validation already ran
+            context.errors = list(entry.errors)
+        yield
+        if entry is not None and entry.errors is None and context.errors is not None:
+            entry.errors = list(context.errors)
+
+class PersistedQueryNotFound(Exception):
+    pass
+
+class PersistedQueryRouter(GraphQLRouter):
+    """
+    GraphQLRouter accepting Apollo-style automatic persisted queries: a
+    request may carry extensions.persistedQuery.sha256Hash instead of the
+    query text. Unknown hashes get a PersistedQueryNotFound error, after
+    which the client resends the text along with the hash to register it.
+    Works for GET as well, so hashed queries are cacheable URLs.
+    """
+
+    async def parse_http_body(self, request) -> GraphQLRequestData:
+        content_type = request.content_type or ""
+        if "application/json" in content_type:
+            data = self.parse_json(await request.get_body())
+        elif request.method == "GET" and not content_type.startswith("multipart/form-data"):
+            data = self.parse_query_params(request.query_params)
+            if isinstance(data.get("extensions"), str):
+                data["extensions"] = self.parse_json(data["extensions"])
+        else:
+            return await super().parse_http_body(request)
+
+        query = data.get("query")
+        persisted = (data.get("extensions") or {}).get("persistedQuery")
+        if persisted:
+            query_hash = persisted.get("sha256Hash")
+            if not isinstance(query_hash, str):
+                raise HTTPException(400, "persistedQuery needs a sha256Hash")
+            if query is None:
+                entry = documents.get(query_hash)
+                if entry is None:
+                    raise PersistedQueryNotFound()
+                query = entry.query
+            elif DocumentStore.hash(query) != query_hash:
+                raise HTTPException(400, "provided sha does not match query")
+            else:
+                documents.add(query_hash, query)
+
+        return GraphQLRequestData(
+            query=query,
+            variables=data.get("variables"),
+            operation_name=data.get("operationName")
+        )
+
+    async def execute_operation(self, request, context, root_value) -> ExecutionResult:
+        try:
+            return await super().execute_operation(request, context, root_value)
+        except PersistedQueryNotFound:
+            return ExecutionResult(
+                data=None,
+                errors=[GraphQLError(
+                    "PersistedQueryNotFound",
+                    extensions={"code": "PERSISTED_QUERY_NOT_FOUND"}
+                )]
+            )
@@ -0,0 +1,92 @@
+import asyncio
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from strawberry.dataloader import DataLoader
+from app.models import AsyncSessionLocal
+from app.models.user import User as UserModel
+from app.models.topic import Topic as TopicModel
+from app.models.comment import Comment as CommentModel
+from app.graphql.connections import PageRequest
+from app.utils.pagination import keyset_window
+
+class Loaders:
+    """
+    Per-request DataLoaders. Each collects the keys requested while one
+    level of the query is resolved and fetches them with a single
+    ``IN (...)`` query (deduplicated and cached for the rest of the
+    request), so round trips grow with query depth, not result size.
+
+    All loaders share the request's AsyncSession, which can't run two
+    statements at once, so every query (including the root fields' own
+    through fetch_all) holds ``lock``. Without a session (subscriptions,
+    which live as long as their WebSocket) each batch runs in a
+    short-lived session of its own, so an idle subscriber holds no
+    connection.
+    """
+
+    def __init__(self, db: Optional[AsyncSession] = None):
+        self.db = db
+        self.lock = asyncio.Lock()
+        self.user_by_id = DataLoader(load_fn=self._load_users)
+        self.topic_by_id = DataLoader(load_fn=self._load_topics)
+        # Keyed by (parent id, PageRequest); values are raw keyset pages for build_connection
+        self.comment_pages_by_topic = DataLoader(load_fn=self._load_comment_pages)
+        self.topic_pages_by_user = DataLoader(load_fn=self._load_topic_pages)
+
+    def clear(self):
+        """Forget everything loaded, so later loads see fresh rows"""
+        for loader in (self.user_by_id, self.topic_by_id, self.comment_pages_by_topic, self.topic_pages_by_user):
+            loader.clear_all()
+
+    async def fetch_all(self, query):
+        """Run a select on the shared session and return its ORM objects"""
+        if self.db is None:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(query)
+                return result.scalars().all()
+        async with self.lock:
+            result = await self.db.execute(query)
+            return result.scalars().all()
+
+    async def _load_users(self, ids: List[int]) -> List[UserModel]:
+        users = await self.fetch_all(select(UserModel).where(UserModel.id.in_(ids)))
+        by_id: Dict[int, UserModel] = {user.id: user for user in users}
+        return [by_id.get(user_id) for user_id in ids]
+
+    async def _load_topics(self, ids: List[int]) -> List[TopicModel]:
+        topics = await self.fetch_all(select(TopicModel).where(TopicModel.id.in_(ids)))
+        by_id: Dict[int, TopicModel] = {topic.id: topic for topic in topics}
+        return [by_id.get(topic_id) for topic_id in ids]
+
+    async def _load_pages(self, model, partition_column, descending: bool, keys: List[Tuple[int, PageRequest]]):
+        """
+        Pages of several parents' listings. Keys asking for the same page
+        (the usual case: one nested field under a list) share a single
+        ROW_NUMBER() windowed query, so no parent's listing is read past
+        its page however long it is.
+        """
+        rows_by_key = {}
+        parents_by_page = defaultdict(list)
+        for parent_id, page in keys:
+            parents_by_page[page].append(parent_id)
+
+        for page, parent_ids in parents_by_page.items():
+            rows = await self.fetch_all(keyset_window(
+                model, partition_column, model.created_at, model.id,
+                parent_ids, page.cursor, page.limit, descending
+            ))
+            grouped = defaultdict(list)
+            for row in rows:
+                grouped[getattr(row, partition_column.key)].append(row)
+            for parent_id in parent_ids:
+                rows_by_key[(parent_id, page)] = grouped[parent_id]
+
+        return [rows_by_key[key] for key in keys]
+
+    async def _load_comment_pages(self, keys: List[Tuple[int, PageRequest]]) -> List[List[CommentModel]]:
+        return await self._load_pages(CommentModel, CommentModel.topic_id, False, keys)
+
+    async def _load_topic_pages(self, keys: List[Tuple[int, PageRequest]]) -> List[List[TopicModel]]:
+        return await self._load_pages(TopicModel, TopicModel.user_id, True, keys)
@@ -1,10 +1,20 @@
 import strawberry
-from typing import List, Optional
+from typing import AsyncGenerator, Optional
 from datetime import datetime
-from strawberry.fastapi import GraphQLRouter
-from sqlalchemy.orm import Session
+from strawberry.subscriptions import GRAPHQL_TRANSPORT_WS_PROTOCOL, GRAPHQL_WS_PROTOCOL
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import Depends  # Add this line
-from app.models import get_db
+from fastapi import WebSocket
+from fastapi.requests import HTTPConnection
+from jose import JWTError, jwt
+from app.config import settings
+from app.models import get_async_db
+from app.graphql.extensions import DocumentCache, PersistedQueryRouter, QueryCostLimiter
+from app.graphql.connections import Connection, build_connection, page_request
+from app.graphql.loaders import Loaders
+from app.services.pubsub import comments_channel, live_updates, notifications_channel
+from app.utils.pagination import keyset_query
 from app.models.user import User as UserModel
 from app.models.topic import Topic as TopicModel
 from app.models.comment import Comment as CommentModel
@@ -19,11 +29,28 @@ class User:
     bio: Optional[str] = None
     created_at: datetime
     
+    @classmethod
+    def from_orm(cls, user: UserModel):
+        return cls(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            bio=user.bio,
+            created_at=user.created_at
+        )
+    
     @strawberry.field
-    def topics(self, info) -> List["Topic"]:
-        db = info.context["db"]
-        user_topics = db.query(TopicModel).filter(TopicModel.user_id == self.id).all()
-        return [Topic.from_orm(topic) for topic in user_topics]
+    async def topics(
+        self,
+        info,
+        first: Optional[int] = None,
+        after: Optional[str] = None,
+        last: Optional[int] = None,
+        before: Optional[str] = None
+    ) -> Connection["Topic"]:
+        page = page_request(first, after, last, before)
+        rows = await info.context["loaders"].topic_pages_by_user.load((self.id, page))
+        return build_connection(rows, page, Topic.from_orm)
 
 @strawberry.type
 class Topic:
@@ -34,6 +61,8 @@ class Topic:
     created_at: datetime
     updated_at: Optional[datetime] = None
     view_count: int
+    comments_count: int = 0
+    last_activity_at: Optional[datetime] = None
     
     @classmethod
     def from_orm(cls, topic: TopicModel):
@@ -44,31 +73,28 @@ class Topic:
             user_id=topic.user_id,
             created_at=topic.created_at,
             updated_at=topic.updated_at,
-            view_count=topic.view_count
-        )
-    
-    @strawberry.field
-    def user(self, info) -> User:
-        db = info.context["db"]
-        user = db.query(UserModel).filter(UserModel.id == self.user_id).first()
-        return User(
-            id=user.id,
-            username=user.username,
-            email=user.email,
-            bio=user.bio,
-            created_at=user.created_at
+            view_count=topic.view_count,
+            comments_count=topic.comments_count or 0,
+            last_activity_at=topic.last_activity_at
         )
     
     @strawberry.field
-    def comments(self, info) -> List["Comment"]:
-        db = info.context["db"]
-        topic_comments = db.query(CommentModel).filter(CommentModel.topic_id == self.id).all()
-        return [Comment.from_orm(comment) for comment in topic_comments]
+    async def user(self, info) -> User:
+        user = await info.context["loaders"].user_by_id.load(self.user_id)
+        return User.from_orm(user)
     
     @strawberry.field
-    def comments_count(self, info) -> int:
-        db = info.context["db"]
-        return db.query(CommentModel).filter(CommentModel.topic_id == self.id).count()
+    async def comments(
+        self,
+        info,
+        first: Optional[int] = None,
+        after: Optional[str] = None,
+        last: Optional[int] = None,
+        before: Optional[str] = None
+    ) -> Connection["Comment"]:
+        page = page_request(first, after, last, before)
+        rows = await info.context["loaders"].comment_pages_by_topic.load((self.id, page))
+        return build_connection(rows, page, Comment.from_orm)
 
 @strawberry.type
 class Comment:
@@ -90,22 +116,25 @@ class Comment:
             updated_at=comment.updated_at
         )
     
-    @strawberry.field
-    def user(self, info) -> User:
-        db = info.context["db"]
-        user = db.query(UserModel).filter(UserModel.id == self.user_id).first()
-        return User(
-            id=user.id,
-            username=user.username,
-            email=user.email,
-            bio=user.bio,
-            created_at=user.created_at
+    @classmethod
+    def from_event(cls, event: dict):
+        return cls(
+            id=event["id"],
+            content=event["content"],
+            user_id=event["user_id"],
+            topic_id=event["topic_id"],
+            created_at=datetime.fromisoformat(event["created_at"]),
+            updated_at=None
         )
     
     @strawberry.field
-    def topic(self, info) -> Topic:
-        db = info.context["db"]
-        topic = db.query(TopicModel).filter(TopicModel.id == self.topic_id).first()
+    async def user(self, info) -> User:
+        user = await info.context["loaders"].user_by_id.load(self.user_id)
+        return User.from_orm(user)
+    
+    @strawberry.field
+    async def topic(self, info) -> Topic:
+        topic = await info.context["loaders"].topic_by_id.load(self.topic_id)
         return Topic.from_orm(topic)
 
 @strawberry.type
@@ -129,59 +158,135 @@ class Notification:
             created_at=notification.created_at,
             is_read=notification.is_read
         )
+    
+    @classmethod
+    def from_event(cls, user_id: int, event: dict):
+        return cls(
+            id=event["id"],
+            message=event["message"],
+            user_id=user_id,
+            topic_id=event.get("topic_id"),
+            comment_id=event.get("comment_id"),
+            created_at=datetime.fromisoformat(event["created_at"]),
+            is_read=event.get("is_read", False)
+        )
 
 # Queries
 @strawberry.type
 class Query:
     @strawberry.field
-    def topic(self, info, id: int) -> Optional[Topic]:
-        db = info.context["db"]
-        topic = db.query(TopicModel).filter(TopicModel.id == id).first()
+    async def topic(self, info, id: int) -> Optional[Topic]:
+        topic = await info.context["loaders"].topic_by_id.load(id)
         if not topic:
             return None
         return Topic.from_orm(topic)
     
     @strawberry.field
-    def topics(self, info, limit: int = 10, offset: int = 0) -> List[Topic]:
-        db = info.context["db"]
-        topics = db.query(TopicModel).order_by(TopicModel.created_at.desc()).offset(offset).limit(limit).all()
-        return [Topic.from_orm(topic) for topic in topics]
+    async def topics(
+        self,
+        info,
+        first: Optional[int] = None,
+        after: Optional[str] = None,
+        last: Optional[int] = None,
+        before: Optional[str] = None
+    ) -> Connection[Topic]:
+        page = page_request(first, after, last, before)
+        loaders = info.context["loaders"]
+        topics = await loaders.fetch_all(
+            keyset_query(select(TopicModel), TopicModel.created_at, TopicModel.id, page.cursor, page.limit, descending=True)
+        )
+        for topic in topics:
+            loaders.topic_by_id.prime(topic.id, topic)
+        return build_connection(topics, page, Topic.from_orm)
     
     @strawberry.field
-    def user(self, info, id: int) -> Optional[User]:
-        db = info.context["db"]
-        user = db.query(UserModel).filter(UserModel.id == id).first()
+    async def user(self, info, id: int) -> Optional[User]:
+        user = await info.context["loaders"].user_by_id.load(id)
         if not user:
             return None
-        return User(
-            id=user.id,
-            username=user.username,
-            email=user.email,
-            bio=user.bio,
-            created_at=user.created_at
-        )
+        return User.from_orm(user)
     
     @strawberry.field
-    def comments(self, info, topic_id: int) -> List[Comment]:
-        db = info.context["db"]
-        comments = db.query(CommentModel).filter(CommentModel.topic_id == topic_id).all()
-        return [Comment.from_orm(comment) for comment in comments]
+    async def comments(
+        self,
+        info,
+        topic_id: int,
+        first: Optional[int] = None,
+        after: Optional[str] = None,
+        last: Optional[int] = None,
+        before: Optional[str] = None
+    ) -> Connection[Comment]:
+        page = page_request(first, after, last, before)
+        rows = await info.context["loaders"].comment_pages_by_topic.load((topic_id, page))
+        return build_connection(rows, page, Comment.from_orm)
     
     @strawberry.field
-    def notifications(self, info, user_id: int) -> List[Notification]:
-        db = info.context["db"]
-        notifications = db.query(NotificationModel).filter(
-            NotificationModel.user_id == user_id
-        ).order_by(
-            NotificationModel.created_at.desc()
-        ).all()
-        return [Notification.from_orm(notification) for notification in notifications]
+    async def notifications(
+        self,
+        info,
+        user_id: int,
+        first: Optional[int] = None,
+        after: Optional[str] = None,
+        last: Optional[int] = None,
+        before: Optional[str] = None
+    ) -> Connection[Notification]:
+        page = page_request(first, after, last, before)
+        notifications = await info.context["loaders"].fetch_all(
+            keyset_query(
+                select(NotificationModel).where(NotificationModel.user_id == user_id),
+                NotificationModel.created_at, NotificationModel.id, page.cursor, page.limit, descending=True
+            )
+        )
+        return build_connection(notifications, page, Notification.from_orm)
+
+# Subscriptions
+def _subscriber_id(info) -> int:
+    # The token comes in the connection_init payload, or like the
+    # notifications WebSocket, in the URL's query string
+    params = info.context.get("connection_params") or {}
+    token = params.get("token") if isinstance(params, dict) else None
+    if not token:
+        token = info.context["request"].query_params.get("token")
+    if not token:
+        raise PermissionError("Not authenticated")
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
+        return int(payload.get("sub"))
+    except (JWTError, TypeError, ValueError):
+        raise PermissionError("Could not validate credentials")
+
+@strawberry.type
+class Subscription:
+    @strawberry.subscription
+    async def comment_added(self, info, topic_id: int) -> AsyncGenerator[Comment, None]:
+        async for event in live_updates.subscribe(comments_channel(topic_id)):
+            yield Comment.from_event(event)
+            # The context outlives this event; don't serve its cached objects to the next one
+            info.context["loaders"].clear()
+    
+    @strawberry.subscription
+    async def notification_received(self, info) -> AsyncGenerator[Notification, None]:
+        user_id = _subscriber_id(info)
+        async for event in live_updates.subscribe(notifications_channel(user_id)):
+            yield Notification.from_event(user_id, event)
 
 # Create Schema
-schema = strawberry.Schema(query=Query)
+schema = strawberry.Schema(
+    query=Query,
+    subscription=Subscription,
+    extensions=[DocumentCache, QueryCostLimiter]
+)
 
 # GraphQL Router
-def get_context(db: Session = Depends(get_db)):
-    return {"db": db}
+async def get_context(connection: HTTPConnection, db: AsyncSession = Depends(get_async_db)):
+    if isinstance(connection, WebSocket):
+        # Subscriptions outlive any reasonable transaction: no shared session
+        return {"loaders": Loaders()}
+    # Loaders cache per request: a new set for every operation
+    return {"db": db, "loaders": Loaders(db)}
 
-graphql_router = GraphQLRouter(schema, context_getter=get_context)
\ No newline at end of file
+graphql_router = PersistedQueryRouter(
+    schema,
+    context_getter=get_context,
+    subscription_protocols=(GRAPHQL_TRANSPORT_WS_PROTOCOL, GRAPHQL_WS_PROTOCOL)
+)
\ No newline at end of file
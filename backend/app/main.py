@@ -1,15 +1,28 @@
+import threading
+import time
+from datetime import datetime, timezone
 from fastapi import FastAPI, Depends
+from sqlalchemy import func, select
 from fastapi.middleware.cors import CORSMiddleware
-from app.models import Base, engine
+from app.models import engine, async_engine
+from app.models.migrations import upgrade_database
 from app.controllers import user, topic, comment, notification
 from app.services.notification_service import init_notification_worker
 from app.services.search_service import search_service
+from app.services.view_counter import view_counter
+from app.services.counter_service import start_counter_reconciler
+from app.services.pubsub import live_updates
 from app.models import get_db
 from app.models.topic import Topic
+from app.models.comment import Comment
 from app.graphql.schema import graphql_router
+from app.config import settings
+from app.utils.db_pool import pool_status
+from app.utils.query_counter import QueryCountMiddleware
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+# Create / upgrade tables
+if settings.RUN_MIGRATIONS_ON_STARTUP:
+    upgrade_database()
 
 # Initialize FastAPI app
 app = FastAPI(title="Real-Time Discussion Forum")
@@ -21,8 +34,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Link", "X-Next-Cursor", "X-Prev-Cursor", "X-Query-Count"],
 )
 
+# Report how many SQL statements each request issued
+app.add_middleware(QueryCountMiddleware)
+
 # Include routers
 app.include_router(user.router, prefix="/api/users", tags=["users"])
 app.include_router(topic.router, prefix="/api/topics", tags=["topics"])
@@ -37,20 +54,121 @@ app.include_router(graphql_router, prefix="/graphql")
 def startup_notification_worker():
     init_notification_worker()
 
+# Start the write-behind view count flusher
+@app.on_event("startup")
+def startup_view_counter():
+    view_counter.start()
+
+# Periodically repair drifted topic comment counters
+@app.on_event("startup")
+def startup_counter_reconciler():
+    start_counter_reconciler()
+
 # Initialize search service
 @app.on_event("startup")
 def startup_search_service():
+    def stream(db, columns, *criteria):
+        # Server-side cursor over just the columns the index needs, in batches
+        query = select(*columns).where(*criteria).execution_options(
+            yield_per=settings.SEARCH_BOOTSTRAP_BATCH_SIZE
+        )
+        return db.execute(query).partitions()
+    
+    topic_columns = (
+        Topic.id,
+        Topic.title,
+        Topic.content,
+        Topic.view_count,
+        Topic.created_at,
+        Topic.updated_at
+    )
+    comment_columns = (
+        Comment.id,
+        Comment.topic_id,
+        Comment.content,
+        Comment.created_at,
+        Comment.updated_at
+    )
+    
     def init_search():
+        # Subscribe before building so no mutation from another worker is missed
+        if settings.SEARCH_CHANGE_FEED:
+            feed = threading.Thread(target=search_service.listen_for_changes)
+            feed.daemon = True
+            feed.start()
+        
         db = next(get_db())
-        topics = db.query(Topic).all()
-        search_service.initialize(topics)
+        if search_service.load_snapshot(settings.SEARCH_SNAPSHOT_PATH):
+            # Replay only what changed since the snapshot was taken
+            marker = datetime.fromtimestamp(search_service.high_water, tz=timezone.utc)
+            changed_since = func.coalesce(Topic.updated_at, Topic.created_at) >= marker
+            search_service.start_bootstrap(db.query(func.count(Topic.id)).filter(changed_since).scalar())
+            for batch in stream(db, topic_columns, changed_since):
+                search_service.add_topics(batch)
+            comments_changed_since = func.coalesce(Comment.updated_at, Comment.created_at) >= marker
+            for batch in stream(db, comment_columns, comments_changed_since):
+                search_service.add_comments(batch)
+            search_service.finish_bootstrap(
+                [topic_id for topic_id, in db.query(Topic.id)],
+                [comment_id for comment_id, in db.query(Comment.id)]
+            )
+        else:
+            search_service.start_bootstrap(db.query(func.count(Topic.id)).scalar())
+            for batch in stream(db, topic_columns):
+                search_service.add_topics(batch)
+            for batch in stream(db, comment_columns):
+                search_service.add_comments(batch)
+            search_service.finish_bootstrap()
+        db.close()
+        
+        # Periodically persist the index for the next warm start
+        while settings.SEARCH_SNAPSHOT_INTERVAL_SECONDS > 0:
+            time.sleep(settings.SEARCH_SNAPSHOT_INTERVAL_SECONDS)
+            try:
+                search_service.save_snapshot(settings.SEARCH_SNAPSHOT_PATH)
+            except OSError as e:
+                print(f"Error saving search snapshot: {e}")
     
     # Initialize in a separate thread to avoid blocking startup
-    import threading
     thread = threading.Thread(target=init_search)
     thread.daemon = True
     thread.start()
 
+@app.on_event("shutdown")
+def shutdown_view_counter():
+    try:
+        view_counter.flush()
+    except Exception as e:
+        print(f"Error flushing view counts: {e}")
+
+@app.on_event("shutdown")
+def shutdown_search_service():
+    if search_service.initialized:
+        try:
+            search_service.save_snapshot(settings.SEARCH_SNAPSHOT_PATH)
+        except OSError as e:
+            print(f"Error saving search snapshot: {e}")
+
+@app.on_event("shutdown")
+async def shutdown_live_updates():
+    await live_updates.close()
+
+@app.on_event("shutdown")
+async def shutdown_database():
+    await async_engine.dispose()
+
+@app.get("/api/metrics/db-pool")
+def db_pool_metrics():
+    return {
+        "mode": settings.DB_POOL_MODE,
+        "sync": pool_status(engine.pool),
+        "async": pool_status(async_engine.pool)
+    }
+
+@app.get("/api/metrics/live-updates")
+def live_updates_metrics():
+    return live_updates.stats()
+
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the Real-Time Discussion Forum API"}
\ No newline at end of file
@@ -1,10 +1,55 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy.pool import NullPool
 from app.config import settings
+from app.utils.db_pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool
+from app.utils.query_counter import install_query_counter
 
-engine = create_engine(settings.DATABASE_URL)
+# Async driver for each sync URL scheme we support
+_ASYNC_DRIVERS = (
+    ("postgresql+psycopg2://", "postgresql+asyncpg://"),
+    ("postgresql://", "postgresql+asyncpg://"),
+    ("postgres://", "postgresql+asyncpg://"),
+    ("sqlite://", "sqlite+aiosqlite://"),
+)
+
+def async_database_url(url: str) -> str:
+    """The async-driver equivalent of a sync database URL"""
+    for sync_prefix, async_prefix in _ASYNC_DRIVERS:
+        if url.startswith(sync_prefix):
+            return async_prefix + url[len(sync_prefix):]
+    return url
+
+def pool_options(pool_class):
+    """Engine keyword arguments for the configured pooling mode"""
+    if settings.DB_POOL_MODE == "null":
+        # Transaction-scoped: the external pooler does the pooling
+        return {"poolclass": NullPool}
+    return {
+        "poolclass": pool_class,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING
+    }
+
+# Sync engine: background threads (search bootstrap, view flusher) and GraphQL
+engine = create_engine(settings.DATABASE_URL, **pool_options(InstrumentedQueuePool))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine: REST request handlers, so a slow query doesn't hold a thread
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL),
+    **pool_options(InstrumentedAsyncQueuePool)
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Per-request statement counts (X-Query-Count)
+install_query_counter(engine)
+install_query_counter(async_engine.sync_engine)
+
 class Base(DeclarativeBase):
     pass
 
@@ -14,4 +59,18 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# Async DB Dependency
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def refresh_with(db: AsyncSession, instance, *relationships):
+    """
+    Reload an instance's columns and the named relationships. Async sessions
+    can't lazy load, so relationships a response needs must be loaded here.
+    """
+    await db.refresh(instance)
+    if relationships:
+        await db.refresh(instance, list(relationships))
@@ -1,10 +1,13 @@
-from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.models import Base
 
 class Comment(Base):
     __tablename__ = "comments"
+    __table_args__ = (
+        Index("ix_comments_topic_id_created_at_id", "topic_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     content = Column(Text)
@@ -0,0 +1,32 @@
+import os
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import text
+from app.models import engine
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Arbitrary key for the PostgreSQL advisory lock serializing migrations
+MIGRATION_LOCK_ID = 7_204_311
+
+def alembic_config():
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+    return config
+
+def upgrade_database(revision="head"):
+    """Apply pending Alembic migrations; workers starting together wait for the first"""
+    config = alembic_config()
+    with engine.connect() as connection:
+        postgres = connection.dialect.name == "postgresql"
+        if postgres:
+            # Session-level lock, so it outlives the commit below
+            connection.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+            connection.commit()
+        try:
+            config.attributes["connection"] = connection
+            command.upgrade(config, revision)
+        finally:
+            if postgres:
+                connection.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+                connection.commit()
@@ -1,10 +1,13 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.models import Base
 
 class Topic(Base):
     __tablename__ = "topics"
+    __table_args__ = (
+        Index("ix_topics_created_at_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
@@ -14,6 +17,11 @@ class Topic(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     view_count = Column(Integer, default=0)
     
+    # Maintained on comment create/delete (and reconciled periodically) so
+    # listings don't aggregate comments
+    comments_count = Column(Integer, nullable=False, default=0, server_default="0")
+    last_activity_at = Column(DateTime(timezone=True), default=func.now())
+    
     # Relationships
     user = relationship("User", backref="topics")
     comments = relationship("Comment", back_populates="topic", cascade="all, delete-orphan")
\ No newline at end of file
@@ -27,6 +27,17 @@ class Topic(TopicBase):
 
 class TopicDetail(Topic):
     comments_count: int
+    last_activity_at: Optional[datetime] = None
+    
+    class Config:
+        orm_mode = True
+
+class CommentSnippet(BaseModel):
+    id: int
+    snippet: str
+
+class TopicSearchResult(Topic):
+    matching_comment: Optional[CommentSnippet] = None
     
     class Config:
         orm_mode = True
\ No newline at end of file
@@ -0,0 +1,198 @@
+import json
+import threading
+import time
+import uuid
+import redis
+from app.config import settings
+
+# Redis client for cached results
+redis_client = redis.Redis(
+    host=settings.REDIS_HOST,
+    port=settings.REDIS_PORT,
+    decode_responses=True
+)
+
+# How long a waiting request polls for another worker's recomputation
+LOCK_POLL_SECONDS = 0.025
+
+# Release a lock only if the caller's token still owns it
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+_release_script = redis_client.register_script(_RELEASE_SCRIPT)
+
+def acquire_lock(key, ttl_seconds, client=None):
+    """Take a Redis lock (SET NX PX); returns its owner token, or None if it is held"""
+    token = uuid.uuid4().hex
+    locked = (client or redis_client).set(key, token, nx=True, px=int(ttl_seconds * 1000))
+    return token if locked else None
+
+def release_lock(key, token, client=None):
+    """Release a lock from acquire_lock, atomically and only if token still owns it"""
+    _release_script(keys=[key], args=[token], client=client or redis_client)
+
+def _dumps(value):
+    return json.dumps(value, separators=(",", ":"))
+
+class ResultCache:
+    """
+    JSON result cache in Redis with stampede protection.
+
+    Entries are stored as ``{"v": value, "fresh_until": timestamp}`` and kept
+    in Redis for ``ttl + stale_ttl`` seconds. A fresh entry is returned as
+    is. A stale entry is returned too, while a single background refresh
+    brings it up to date (stale-while-revalidate). On a miss only one caller
+    recomputes: concurrent callers in this process wait on a local lock, and
+    callers in other workers wait for a short Redis lock and then read the
+    value it produced (single-flight). If Redis is unavailable the value is
+    simply computed.
+    """
+
+    def __init__(self, client=None, namespace="cache", lock_timeout=5.0):
+        self.client = client or redis_client
+        self.namespace = namespace
+        self.lock_timeout = lock_timeout
+        self._local_locks = {}
+        self._local_guard = threading.Lock()
+        self.counters = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "recomputes": 0,
+            "lock_waits": 0,
+            "errors": 0
+        }
+
+    def _count(self, name):
+        # Slightly lossy under contention, which is fine for metrics
+        self.counters[name] += 1
+
+    def stats(self):
+        """Counters plus the hit ratio (stale hits count as hits)"""
+        counters = dict(self.counters)
+        lookups = counters["hits"] + counters["stale_hits"] + counters["misses"]
+        counters["hit_ratio"] = round((counters["hits"] + counters["stale_hits"]) / lookups, 4) if lookups else None
+        return counters
+
+    def _key(self, key):
+        return f"{self.namespace}:{key}"
+
+    def _read(self, key):
+        raw = self.client.get(self._key(key))
+        if raw is None:
+            return None
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return None
+
+    def _write(self, key, value, ttl, stale_ttl):
+        entry = {"v": value, "fresh_until": time.time() + ttl}
+        self.client.set(self._key(key), _dumps(entry), ex=max(1, int(ttl + stale_ttl)))
+
+    def _acquire(self, key):
+        return acquire_lock(self._key(f"lock:{key}"), self.lock_timeout, client=self.client)
+
+    def _release_lock(self, key, token):
+        release_lock(self._key(f"lock:{key}"), token, client=self.client)
+
+    def _local_lock(self, key):
+        with self._local_guard:
+            lock = self._local_locks.get(key)
+            if lock is None:
+                lock = self._local_locks[key] = threading.Lock()
+            return lock
+
+    def _drop_local_lock(self, key, lock):
+        with self._local_guard:
+            if self._local_locks.get(key) is lock:
+                del self._local_locks[key]
+
+    def _recompute(self, key, compute, ttl, stale_ttl, token):
+        try:
+            self._count("recomputes")
+            value = compute()
+            self._write(key, value, ttl, stale_ttl)
+            return value
+        finally:
+            self._release_lock(key, token)
+
+    def _refresh_in_background(self, key, compute, ttl, stale_ttl):
+        token = self._acquire(key)
+        if token is None:
+            return  # someone else is already refreshing
+
+        def refresh():
+            try:
+                self._recompute(key, compute, ttl, stale_ttl, token)
+            except Exception as e:
+                self._count("errors")
+                print(f"Error refreshing cache entry {key}: {e}")
+
+        thread = threading.Thread(target=refresh)
+        thread.daemon = True
+        thread.start()
+
+    def get_or_compute(self, key, compute, ttl, stale_ttl=0):
+        """
+        Return the cached value for key, calling compute() to (re)fill it.
+        compute() must return something JSON serializable; tuples come back
+        as lists.
+        """
+        try:
+            entry = self._read(key)
+        except redis.RedisError as e:
+            self._count("errors")
+            print(f"Error reading cache entry {key}: {e}")
+            return compute()
+
+        if entry is not None:
+            if entry["fresh_until"] > time.time():
+                self._count("hits")
+            else:
+                self._count("stale_hits")
+                try:
+                    self._refresh_in_background(key, compute, ttl, stale_ttl)
+                except redis.RedisError as e:
+                    self._count("errors")
+                    print(f"Error refreshing cache entry {key}: {e}")
+            return entry["v"]
+
+        self._count("misses")
+        lock = self._local_lock(key)
+        with lock:
+            try:
+                return self._fill(key, compute, ttl, stale_ttl)
+            except redis.RedisError as e:
+                self._count("errors")
+                print(f"Error filling cache entry {key}: {e}")
+                return compute()
+            finally:
+                self._drop_local_lock(key, lock)
+
+    def _fill(self, key, compute, ttl, stale_ttl):
+        deadline = time.time() + self.lock_timeout
+        while True:
+            # A caller that held the lock before us may have filled it already
+            entry = self._read(key)
+            if entry is not None:
+                return entry["v"]
+            token = self._acquire(key)
+            if token is not None:
+                return self._recompute(key, compute, ttl, stale_ttl, token)
+            if time.time() >= deadline:
+                # The owner is stuck or died; don't wait forever
+                self._count("recomputes")
+                return compute()
+            self._count("lock_waits")
+            time.sleep(LOCK_POLL_SECONDS)
+
+    def invalidate(self, key):
+        self.client.delete(self._key(key))
+
+# Shared result cache instance
+result_cache = ResultCache()
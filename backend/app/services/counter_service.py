@@ -0,0 +1,53 @@
+import threading
+import time
+from sqlalchemy import text
+from app.models import SessionLocal
+from app.config import settings
+
+# Recompute topics.comments_count / last_activity_at from the comments table,
+# touching only rows that drifted (e.g. a crash between the comment write and
+# the counter update, or rows written by older code)
+RECONCILE_TOPIC_COUNTERS = text("""
+UPDATE topics SET
+    comments_count = (SELECT count(*) FROM comments WHERE comments.topic_id = topics.id),
+    last_activity_at = coalesce(
+        (SELECT max(comments.created_at) FROM comments WHERE comments.topic_id = topics.id),
+        topics.created_at
+    )
+WHERE comments_count <> (SELECT count(*) FROM comments WHERE comments.topic_id = topics.id)
+   OR last_activity_at IS NULL
+   OR last_activity_at < coalesce(
+        (SELECT max(comments.created_at) FROM comments WHERE comments.topic_id = topics.id),
+        topics.created_at
+    )
+""")
+
+def reconcile_topic_counters():
+    """Fix drifted topic counters; returns the number of topics corrected"""
+    db = SessionLocal()
+    try:
+        result = db.execute(RECONCILE_TOPIC_COUNTERS)
+        db.commit()
+        return result.rowcount
+    finally:
+        db.close()
+
+def start_counter_reconciler():
+    """Reconcile periodically in a background thread (0 disables it)"""
+    interval = settings.COUNTER_RECONCILE_INTERVAL_SECONDS
+    if interval <= 0:
+        return
+
+    def run():
+        while True:
+            time.sleep(interval)
+            try:
+                corrected = reconcile_topic_counters()
+                if corrected:
+                    print(f"Reconciled comment counters of {corrected} topics")
+            except Exception as e:
+                print(f"Error reconciling topic counters: {e}")
+
+    thread = threading.Thread(target=run)
+    thread.daemon = True
+    thread.start()
@@ -4,6 +4,7 @@ import pika
 from typing import Dict, Any
 import threading
 from app.config import settings
+from app.services.pubsub import notifications_channel
 
 # Redis connection
 redis_client = redis.Redis(
@@ -59,10 +60,10 @@ class RabbitMQClient:
 # Singleton RabbitMQ client
 rabbitmq_client = RabbitMQClient()
 
-# Redis Pub/Sub for real-time notifications
+# Redis Pub/Sub for real-time notifications (the WebSocket endpoint and
+# GraphQL notificationReceived subscriptions listen on this channel)
 def publish_notification(user_id: int, message: Dict[str, Any]):
-    channel = f"user:{user_id}:notifications"
-    redis_client.publish(channel, json.dumps(message))
+    redis_client.publish(notifications_channel(user_id), json.dumps(message))
     
     # Also send via RabbitMQ for reliable delivery
     routing_key = f"user.{user_id}.notification"
@@ -0,0 +1,122 @@
+import asyncio
+import json
+from collections import defaultdict
+from typing import Any, AsyncIterator, Dict, Optional, Set
+import redis.asyncio as aioredis
+from redis.exceptions import RedisError
+from app.config import settings
+
+# Channels carrying live events, as JSON. Notifications reuse the channel
+# publish_notification already writes for the notifications WebSocket.
+COMMENTS_CHANNEL = "topic:{topic_id}:comments"
+NOTIFICATIONS_CHANNEL = "user:{user_id}:notifications"
+
+def comments_channel(topic_id: int) -> str:
+    return COMMENTS_CHANNEL.format(topic_id=topic_id)
+
+def notifications_channel(user_id: int) -> str:
+    return NOTIFICATIONS_CHANNEL.format(user_id=user_id)
+
+class PubSubHub:
+    """
+    Per-process fan-out of Redis pub/sub events to local subscribers.
+
+    However many clients are listening, the process holds one Redis
+    connection, pattern-subscribed to every live channel, and a single
+    listener task hands each message to the bounded queues of the local
+    subscribers of its channel. Messages for channels nobody here listens
+    to are dropped unparsed; a subscriber too slow to keep up with
+    `queue_size` pending events loses the newest ones.
+    """
+
+    def __init__(self, patterns, queue_size: int = 100):
+        self.patterns = patterns
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = defaultdict(set)
+        self._listener: Optional[asyncio.Task] = None
+        self._client: Optional[aioredis.Redis] = None
+        self.delivered = 0
+        self.dropped = 0
+
+    def _redis(self) -> aioredis.Redis:
+        if self._client is None:
+            self._client = aioredis.Redis(
+                host=settings.REDIS_HOST,
+                port=settings.REDIS_PORT,
+                decode_responses=True
+            )
+        return self._client
+
+    async def publish(self, channel: str, message: Dict[str, Any]):
+        """Publish an event to every process; failures are logged, not raised"""
+        try:
+            await self._redis().publish(channel, json.dumps(message))
+        except RedisError as e:
+            print(f"Error publishing to {channel}: {e}")
+
+    async def subscribe(self, channel: str) -> AsyncIterator[Dict[str, Any]]:
+        """Yield the events published on channel until the caller stops iterating"""
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers[channel].add(queue)
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.get_running_loop().create_task(self._listen())
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            queues = self._subscribers.get(channel)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[channel]
+
+    async def _listen(self):
+        while True:
+            pubsub = self._redis().pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.psubscribe(*self.patterns)
+                async for message in pubsub.listen():
+                    if message["type"] == "pmessage":
+                        self._dispatch(message["channel"], message["data"])
+            except RedisError as e:
+                print(f"Live updates subscription error: {e}")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.close()
+
+    def _dispatch(self, channel: str, data: str):
+        queues = self._subscribers.get(channel)
+        if not queues:
+            return
+        try:
+            event = json.loads(data)
+        except ValueError:
+            return
+        for queue in list(queues):
+            try:
+                queue.put_nowait(event)
+                self.delivered += 1
+            except asyncio.QueueFull:
+                self.dropped += 1
+
+    def stats(self):
+        return {
+            "channels": len(self._subscribers),
+            "subscribers": sum(len(queues) for queues in self._subscribers.values()),
+            "delivered": self.delivered,
+            "dropped": self.dropped
+        }
+
+    async def close(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+# Shared hub of this process
+live_updates = PubSubHub((
+    COMMENTS_CHANNEL.format(topic_id="*"),
+    NOTIFICATIONS_CHANNEL.format(user_id="*")
+))
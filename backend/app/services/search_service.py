@@ -1,6 +1,25 @@
+import functools
+import heapq
+import json
+import math
+import threading
+import time
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+from array import array
 import redis
 from app.utils.trie import Trie
+from app.utils.inverted_index import InvertedIndex
 from app.utils.heap_ranking import TopicHeap
+from app.utils.suggest import SuggestionIndex
+from app.utils.fuzzy import FuzzyIndex
+from app.utils.analyzer import Analyzer, ENGLISH_STOPWORDS
+from app.utils.trending import ForwardDecay, SharedLeaderboard
+from app.utils.index_snapshot import SnapshotError, SnapshotReader, encode_strings, write_snapshot
+from app.services.cache_service import acquire_lock, release_lock, result_cache
+from app.models import SessionLocal
+from app.models.topic import Topic
 from app.config import settings
 
 # Redis client for caching
@@ -10,106 +29,749 @@ redis_client = redis.Redis(
     decode_responses=True
 )
 
+# Weight of the best matching comment relative to the topic's own BM25 score
+COMMENT_SCORE_WEIGHT = 0.5
+
+# Maximum number of indexed terms a single query token may expand to
+MAX_PREFIX_EXPANSIONS = 50
+MAX_FUZZY_EXPANSIONS = 20
+
+# Compact the index structures after this many topic removals
+COMPACT_EVERY_REMOVALS = 1000
+
+# Redis pub/sub channel carrying index mutations between workers
+CHANGE_FEED_CHANNEL = "search:index:changes"
+
+# Result cache lifetimes: fresh for TTL, then served stale while one request refreshes
+SEARCH_CACHE_TTL = 60
+SEARCH_CACHE_STALE_TTL = 30
+TRENDING_CACHE_TTL = 10
+TRENDING_CACHE_STALE_TTL = 60
+
+# Only one worker writes the (shared) snapshot file at a time
+SNAPSHOT_LOCK_KEY = "search:snapshot:lock"
+SNAPSHOT_LOCK_SECONDS = 300
+
+# Cluster-wide trending scores (forward-decayed, shared by all workers)
+TRENDING_KEY = "trending:topics"
+
+def _synchronized(method):
+    """Serialize index mutations with each other and with searches"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+def _timestamp(topic):
+    changed_at = topic.updated_at or topic.created_at
+    return changed_at.timestamp() if changed_at else 0.0
+
+def _topic_to_dict(topic):
+    return {
+        "id": topic.id,
+        "title": topic.title,
+        "content": topic.content,
+        "view_count": topic.view_count,
+        "created_at": topic.created_at.isoformat() if topic.created_at else None,
+        "updated_at": topic.updated_at.isoformat() if topic.updated_at else None
+    }
+
+def make_snippet(text, query, width=160):
+    """Excerpt of text around the first occurrence of a query word"""
+    if not text:
+        return ""
+    lowered = text.lower()
+    positions = [lowered.find(token) for token in query.lower().split()]
+    positions = [position for position in positions if position >= 0]
+    start = max(0, min(positions) - width // 4) if positions else 0
+    snippet = text[start:start + width].strip()
+    if start > 0:
+        snippet = "..." + snippet
+    if start + width < len(text):
+        snippet += "..."
+    return snippet
+
+def _comment_to_dict(comment):
+    return {
+        "id": comment.id,
+        "topic_id": comment.topic_id,
+        "content": comment.content
+    }
+
+def _topic_from_dict(data):
+    return SimpleNamespace(
+        id=data["id"],
+        title=data["title"],
+        content=data["content"],
+        view_count=data["view_count"],
+        created_at=datetime.fromisoformat(data["created_at"]) if data["created_at"] else None,
+        updated_at=datetime.fromisoformat(data["updated_at"]) if data["updated_at"] else None
+    )
+
 class SearchService:
     def __init__(self):
+        self.analyzer = Analyzer(
+            stopwords=ENGLISH_STOPWORDS if settings.SEARCH_STOPWORDS else None,
+            stemming=settings.SEARCH_STEMMING
+        )
         self.trie = Trie()
-        self.topic_heap = TopicHeap()
+        self.index = InvertedIndex()
+        self.fuzzy = FuzzyIndex()             # topic terms
+        self.comment_words = Trie()           # word -> comment IDs
+        self.comment_fuzzy = FuzzyIndex()     # comment words
+        self.comment_topics = array("I")      # comment_id -> topic_id (0 = not indexed)
+        self.comment_count = 0
+        self.topic_heap = TopicHeap()  # scores are forward-decayed (see ForwardDecay)
+        self.decay = ForwardDecay(settings.TRENDING_HALF_LIFE_HOURS * 3600)
+        self.leaderboard = SharedLeaderboard(redis_client, TRENDING_KEY, settings.TRENDING_HALF_LIFE_HOURS * 3600)
+        self.suggestions = SuggestionIndex(self.topic_heap.get_score)
         self.initialized = False
+        self.removals_since_compact = 0
+        self.high_water = 0.0  # newest created_at/updated_at indexed, as a UNIX timestamp
+        self.lock = threading.RLock()
+        self.worker_id = uuid.uuid4().hex
+        self.changes_applied = 0
+        self.start_bootstrap()
         
     def initialize(self, topics):
         """Initialize search data structures with all topics"""
+        self.start_bootstrap()
+        self.add_topics(topics)
+        self.finish_bootstrap()
+    
+    def start_bootstrap(self, total=None):
+        """Mark the index as building; `total` is the expected number of topics"""
+        self.initialized = False
+        self.bootstrap = {
+            "state": "building",
+            "indexed": 0,
+            "total": total,
+            "batches": 0,
+            "started_at": time.time(),
+            "finished_at": None
+        }
+    
+    def add_topics(self, topics):
+        """Index a batch of topics, writing their Redis cache entries in one pipelined round trip"""
+        topics = list(topics)
+        with self.lock:
+            for topic in topics:
+                if topic.id in self.index:
+                    self._reindex_topic(topic)
+                    # Scores may have moved since the topic was indexed
+                    self.topic_heap.add_topic(topic.id, self._initial_score(topic), topic.title)
+                    self.suggestions.update(topic.id)
+                else:
+                    self._index_topic(topic)
+        
+        pipe = redis_client.pipeline(transaction=False)
         for topic in topics:
-            self.add_topic(topic)
+            self._cache_topic(pipe, topic)
+            self._seed_trending(pipe, topic)
+        pipe.execute()
+        
+        self.bootstrap["indexed"] += len(topics)
+        self.bootstrap["batches"] += 1
+    
+    def finish_bootstrap(self, live_topic_ids=None, live_comment_ids=None):
+        """Mark the index ready, first dropping topics and comments missing from the live IDs if given"""
+        if live_topic_ids is not None:
+            for topic_id in set(self.index.doc_lengths) - set(live_topic_ids):
+                self.remove_topic(topic_id, publish=False)
+        if live_comment_ids is not None:
+            live_comment_ids = set(live_comment_ids)
+            with self.lock:
+                # Without the old text only the topic mapping can be cleared;
+                # searches skip such comments and their postings stay inert
+                for comment_id, topic_id in enumerate(self.comment_topics):
+                    if topic_id and comment_id not in live_comment_ids:
+                        self.comment_topics[comment_id] = 0
+                        self.comment_count -= 1
+        self._seed_trending_from_heap()
+        self.bootstrap["state"] = "ready"
+        self.bootstrap["finished_at"] = time.time()
         self.initialized = True
     
-    def add_topic(self, topic):
+    def status(self):
+        """Readiness flag, bootstrap progress and index size metrics"""
+        bootstrap = self.bootstrap
+        elapsed = (bootstrap["finished_at"] or time.time()) - bootstrap["started_at"]
+        total = bootstrap["total"]
+        return {
+            "ready": self.initialized,
+            "state": bootstrap["state"],
+            "indexed": bootstrap["indexed"],
+            "total": total,
+            "progress": min(1.0, bootstrap["indexed"] / total) if total else None,
+            "batches": bootstrap["batches"],
+            "elapsed_seconds": round(elapsed, 3),
+            "topics_per_second": round(bootstrap["indexed"] / elapsed, 1) if elapsed > 0 else None,
+            "documents": len(self.index),
+            "terms": len(self.index.postings),
+            "comments": self.comment_count,
+            "worker_id": self.worker_id,
+            "changes_applied": self.changes_applied,
+            "cache": result_cache.stats()
+        }
+    
+    @_synchronized
+    def add_topic(self, topic, publish=True):
         """Add a topic to search index"""
-        # Add to Trie for search
+        if topic.id in self.index:
+            return self.update_topic(topic, publish)
+        self._index_topic(topic)
+        
+        # Cache in Redis
+        pipe = redis_client.pipeline(transaction=False)
+        self._cache_topic(pipe, topic)
+        if publish:
+            self._seed_trending(pipe, topic)
+            self._publish_change(pipe, "upsert", topic=_topic_to_dict(topic))
+        pipe.execute()
+    
+    @_synchronized
+    def update_topic(self, topic, publish=True):
+        """Re-index an edited topic, touching only the words that changed"""
+        if topic.id not in self.index:
+            return self.add_topic(topic, publish)
+        self._reindex_topic(topic)
+        
+        pipe = redis_client.pipeline(transaction=False)
+        self._cache_topic(pipe, topic, include_views=False)
+        if publish:
+            self._publish_change(pipe, "upsert", topic=_topic_to_dict(topic))
+        pipe.execute()
+    
+    def _index_topic(self, topic):
+        self.high_water = max(self.high_water, _timestamp(topic))
+        
+        # Add to Trie (term dictionary) and inverted index for search
         words = self._tokenize(topic.title) + self._tokenize(topic.content)
         for word in words:
             self.trie.insert(word, topic.id)
+        self._register_new_terms(words)
+        self.index.add_document(topic.id, words)
         
         # Add to heap for trending topics
-        score = topic.view_count
-        self.topic_heap.add_topic(topic.id, score, topic.title)
+        self.topic_heap.add_topic(topic.id, self._initial_score(topic), topic.title)
+        self.suggestions.add(topic.id, topic.title)
+    
+    def _initial_score(self, topic):
+        # Without per-view history, treat the views so far (plus the post
+        # itself) as activity at the topic's last change
+        return (topic.view_count + 1) * self.decay.weight(_timestamp(topic) or None)
+    
+    def _seed_trending(self, client, topic):
+        # Only sets a score for topics the shared leaderboard does not know yet
+        self.leaderboard.seed(topic.id, topic.view_count + 1, _timestamp(topic) or None, client=client)
+    
+    def _seed_trending_from_heap(self):
+        # A warm start only replays changed topics; if the shared leaderboard
+        # was lost as well, seed it with this worker's current scores
+        try:
+            if len(self.leaderboard):
+                return
+            with self.lock:
+                scores = [(topic_id, self.decay.value(score)) for topic_id, (score, _) in self.topic_heap.topics.items()]
+            pipe = redis_client.pipeline(transaction=False)
+            for topic_id, score in scores:
+                self.leaderboard.seed(topic_id, score, client=pipe)
+            pipe.execute()
+        except redis.RedisError as e:
+            print(f"Error seeding shared trending scores: {e}")
+    
+    def _record_activity(self, topic_id, events=1, shared=True):
+        """Add decayed activity to a topic's trending score: O(log n), no rescans"""
+        with self.lock:
+            if self.decay.needs_rebase():
+                self.topic_heap.scale_scores(self.decay.rebase())
+            self.topic_heap.increment_score(topic_id, events * self.decay.weight())
+            self.suggestions.update(topic_id)
         
-        # Cache in Redis
-        redis_client.hset(
-            f"topic:{topic.id}",
-            mapping={
-                "title": topic.title,
-                "content": topic.content,
-                "views": topic.view_count
+        # The local heap only sees this worker's traffic; the shared one sees everything
+        if shared:
+            try:
+                self.leaderboard.record(topic_id, events)
+            except redis.RedisError as e:
+                print(f"Error updating shared trending score: {e}")
+    
+    def _reindex_topic(self, topic):
+        self.high_water = max(self.high_water, _timestamp(topic))
+        
+        words = self._tokenize(topic.title) + self._tokenize(topic.content)
+        old_words = set(self.index.terms_of(topic.id))
+        new_words = set(words)
+        for word in old_words - new_words:
+            self.trie.remove(word, topic.id)
+        for word in new_words - old_words:
+            self.trie.insert(word, topic.id)
+        self._register_new_terms(new_words)
+        self.index.add_document(topic.id, words)
+        
+        # Keep the accumulated score, only the title may have changed
+        self.topic_heap.set_title(topic.id, topic.title)
+        self.suggestions.add(topic.id, topic.title)
+    
+    def _register_new_terms(self, words):
+        # Terms entering the dictionary become reachable by fuzzy search
+        postings = self.index.postings
+        for word in set(words):
+            if word not in postings:
+                self.fuzzy.add(word)
+    
+    def _cache_topic(self, client, topic, include_views=True):
+        mapping = {
+            "title": topic.title,
+            "content": topic.content
+        }
+        if include_views:
+            mapping["views"] = topic.view_count
+        client.hset(f"topic:{topic.id}", mapping=mapping)
+        client.expire(f"topic:{topic.id}", 3600)  # 1 hour TTL
+    
+    @_synchronized
+    def remove_topic(self, topic_id, publish=True):
+        """Drop a deleted topic from every index structure and the Redis cache"""
+        self._drop_topic(topic_id)
+        
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.delete(f"topic:{topic_id}")
+        if publish:
+            self.leaderboard.remove(topic_id, client=pipe)
+            self._publish_change(pipe, "remove", id=topic_id)
+        pipe.execute()
+    
+    def _drop_topic(self, topic_id):
+        for word in self.index.terms_of(topic_id):
+            self.trie.remove(word, topic_id)
+        self.index.remove_document(topic_id)
+        self.topic_heap.remove_topic(topic_id)
+        self.suggestions.remove(topic_id)
+        
+        self.removals_since_compact += 1
+        if self.removals_since_compact >= COMPACT_EVERY_REMOVALS:
+            self.compact()
+    
+    @_synchronized
+    def add_comment(self, comment, publish=True):
+        """Add a comment's words to the comment index"""
+        self._index_comment(comment.id, comment.topic_id, comment.content)
+        # Every worker applies the comment locally; only its origin counts it cluster-wide
+        self._record_activity(comment.topic_id, settings.TRENDING_COMMENT_WEIGHT, shared=publish)
+        if publish:
+            self._publish_change(redis_client, "comment_upsert", comment=_comment_to_dict(comment))
+    
+    @_synchronized
+    def update_comment(self, comment, old_content, publish=True):
+        """Re-index an edited comment, touching only the words that changed"""
+        old_words = set(self._tokenize(old_content))
+        new_words = set(self._tokenize(comment.content))
+        for word in old_words - new_words:
+            self.comment_words.remove(word, comment.id)
+        for word in new_words - old_words:
+            self.comment_words.insert(word, comment.id)
+        if publish:
+            self._publish_change(
+                redis_client, "comment_upsert",
+                comment=_comment_to_dict(comment), old_content=old_content
+            )
+    
+    @_synchronized
+    def remove_comment(self, comment, publish=True):
+        """Drop a deleted comment from the comment index"""
+        self._unindex_comment(comment.id, comment.content)
+        if publish:
+            self._publish_change(redis_client, "comment_remove", comment=_comment_to_dict(comment))
+    
+    def add_comments(self, comments):
+        """Index a batch of comments (bootstrap)"""
+        with self.lock:
+            for comment in comments:
+                self.high_water = max(self.high_water, _timestamp(comment))
+                self._index_comment(comment.id, comment.topic_id, comment.content)
+    
+    def _index_comment(self, comment_id, topic_id, content):
+        for word in set(self._tokenize(content)):
+            if word not in self.comment_words:
+                self.comment_fuzzy.add(word)
+            self.comment_words.insert(word, comment_id)
+        
+        # Comment IDs are dense, so a flat array beats a dict for the topic mapping
+        if comment_id >= len(self.comment_topics):
+            self.comment_topics.extend(bytes(4 * (comment_id + 1 - len(self.comment_topics))))
+        if not self.comment_topics[comment_id]:
+            self.comment_count += 1
+        self.comment_topics[comment_id] = topic_id
+    
+    def _unindex_comment(self, comment_id, content):
+        for word in set(self._tokenize(content)):
+            self.comment_words.remove(word, comment_id)
+        if comment_id < len(self.comment_topics) and self.comment_topics[comment_id]:
+            self.comment_topics[comment_id] = 0
+            self.comment_count -= 1
+    
+    def _publish_change(self, client, op, **payload):
+        client.publish(CHANGE_FEED_CHANNEL, json.dumps({"origin": self.worker_id, "op": op, **payload}))
+    
+    @_synchronized
+    def apply_change(self, change):
+        """Apply an index mutation published by another worker"""
+        if change.get("origin") == self.worker_id:
+            return
+        if change["op"] == "remove":
+            self._drop_topic(change["id"])
+        elif change["op"] == "upsert":
+            topic = _topic_from_dict(change["topic"])
+            if topic.id in self.index:
+                self._reindex_topic(topic)
+            else:
+                self._index_topic(topic)
+        elif change["op"] == "comment_upsert":
+            comment = SimpleNamespace(**change["comment"])
+            if "old_content" in change:
+                self.update_comment(comment, change["old_content"], publish=False)
+            else:
+                self.add_comment(comment, publish=False)
+        elif change["op"] == "comment_remove":
+            self.remove_comment(SimpleNamespace(**change["comment"]), publish=False)
+        self.changes_applied += 1
+    
+    def listen_for_changes(self):
+        """Apply other workers' index mutations as they are published; blocks forever"""
+        while True:
+            try:
+                pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(CHANGE_FEED_CHANNEL)
+                for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self.apply_change(json.loads(message["data"]))
+            except redis.RedisError as e:
+                print(f"Search change feed error: {e}")
+                time.sleep(1)
+    
+    @_synchronized
+    def compact(self):
+        """Fold tombstones and reclaim memory left behind by removals"""
+        self.trie.compact()
+        self.suggestions.title_words.compact()
+        self.comment_words.compact()
+        self.index.compact()
+        if len(self.fuzzy) > 2 * len(self.index.postings):
+            self.fuzzy.rebuild(self.index.postings)
+        if len(self.comment_fuzzy) > 2 * len(self.comment_words):
+            self.comment_fuzzy.rebuild(self.comment_words.terms)
+        self.removals_since_compact = 0
+    
+    def save_snapshot(self, path):
+        """
+        Write the index to a versioned binary snapshot file. Every worker
+        holds the same index (see the change feed), so when several save at
+        once only the one holding the Redis snapshot lock writes; returns
+        False for the others.
+        """
+        try:
+            token = acquire_lock(SNAPSHOT_LOCK_KEY, SNAPSHOT_LOCK_SECONDS)
+        except redis.RedisError as e:
+            # Writes go through private temp files, so an unguarded one is still safe
+            print(f"Snapshot lock unavailable, writing anyway: {e}")
+            token = ""
+        if token is None:
+            return False
+        try:
+            self._write_snapshot(path)
+        finally:
+            if token:
+                try:
+                    release_lock(SNAPSHOT_LOCK_KEY, token)
+                except redis.RedisError as e:
+                    print(f"Error releasing snapshot lock: {e}")
+        return True
+    
+    def _write_snapshot(self, path):
+        with self.lock:
+            self.trie.compact()
+            title_words = self.suggestions.title_words
+            title_words.compact()
+            self.comment_words.compact()
+            
+            # Postings sorted by term, then doc ID: this doubles as the Trie layout
+            terms = sorted(self.index.postings)
+            post_offsets, post_docs, post_tfs = array("I", [0]), array("I"), array("I")
+            for term in terms:
+                postings = self.index.postings[term]
+                docs = sorted(postings)
+                post_docs.extend(docs)
+                post_tfs.extend(postings[doc_id] for doc_id in docs)
+                post_offsets.append(len(post_docs))
+            
+            doc_ids = array("I", self.index.doc_lengths)
+            doc_lengths = array("I", self.index.doc_lengths.values())
+            topics = [self.topic_heap.topics.get(doc_id, (0, "")) for doc_id in doc_ids]
+            
+            prefixes = list(self.suggestions.completions)
+            completion_offsets, completion_ids = array("I", [0]), array("I")
+            for prefix in prefixes:
+                completion_ids.extend(self.suggestions.completions[prefix])
+                completion_offsets.append(len(completion_ids))
+            
+            sections = {
+                "analyzer": encode_strings([self.analyzer.signature]),
+                "terms": encode_strings(terms),
+                "post_offsets": post_offsets,
+                "post_docs": post_docs,
+                "post_tfs": post_tfs,
+                "doc_ids": doc_ids,
+                "doc_lengths": doc_lengths,
+                "scores": array("d", (score for score, _ in topics)),
+                "decay_epoch": array("d", [self.decay.epoch]),
+                "titles": encode_strings([title for _, title in topics]),
+                "title_words": encode_strings(title_words.terms),
+                "title_offsets": array("I", title_words.offsets),
+                "title_ids": array("I", title_words.ids),
+                "prefixes": encode_strings(prefixes),
+                "prefix_offsets": completion_offsets,
+                "prefix_ids": completion_ids,
+                "comment_words": encode_strings(self.comment_words.terms),
+                "comment_offsets": array("I", self.comment_words.offsets),
+                "comment_ids": array("I", self.comment_words.ids),
+                "comment_topics": array("I", self.comment_topics),
             }
-        )
-        redis_client.expire(f"topic:{topic.id}", 3600)  # 1 hour TTL
+            high_water = self.high_water
+        
+        write_snapshot(path, sections, high_water)
+    
+    def load_snapshot(self, path):
+        """Replace the index with a saved snapshot; returns False if there is none usable"""
+        try:
+            reader = SnapshotReader(path)
+            if reader.strings("analyzer") != [self.analyzer.signature]:
+                raise SnapshotError("built with a different analyzer configuration")
+            terms = reader.strings("terms")
+            post_offsets = reader.array("post_offsets", "I")
+            post_docs = reader.array("post_docs", "I")
+            post_tfs = reader.array("post_tfs", "I")
+            doc_ids = reader.array("doc_ids", "I")
+            
+            index = InvertedIndex()
+            doc_terms = {doc_id: [] for doc_id in doc_ids}
+            for i, term in enumerate(terms):
+                docs = post_docs[post_offsets[i]:post_offsets[i + 1]]
+                index.postings[term] = dict(zip(docs, post_tfs[post_offsets[i]:post_offsets[i + 1]]))
+                for doc_id in docs:
+                    doc_terms[doc_id].append(term)
+            index.doc_terms = {doc_id: tuple(words) for doc_id, words in doc_terms.items()}
+            index.doc_lengths = dict(zip(doc_ids, reader.array("doc_lengths", "I")))
+            index.total_length = sum(index.doc_lengths.values())
+            
+            titles = dict(zip(doc_ids, reader.strings("titles")))
+            scores = reader.array("scores", "d")
+            decay_epoch = reader.array("decay_epoch", "d")[0]
+            
+            prefix_offsets = reader.array("prefix_offsets", "I")
+            prefix_ids = reader.array("prefix_ids", "I")
+            completions = {
+                prefix: list(prefix_ids[prefix_offsets[i]:prefix_offsets[i + 1]])
+                for i, prefix in enumerate(reader.strings("prefixes"))
+            }
+            title_words = Trie.from_arrays(
+                reader.strings("title_words"),
+                reader.array("title_offsets", "I"),
+                reader.array("title_ids", "I")
+            )
+            comment_words = Trie.from_arrays(
+                reader.strings("comment_words"),
+                reader.array("comment_offsets", "I"),
+                reader.array("comment_ids", "I")
+            )
+            comment_topics = array("I", reader.array("comment_topics", "I"))
+        except SnapshotError as e:
+            print(f"Search snapshot not loaded: {e}")
+            return False
+        
+        with self.lock:
+            # The Trie shares the postings layout and reads it straight from the map
+            self.trie = Trie.from_arrays(terms, post_offsets, post_docs)
+            self.index = index
+            self.fuzzy.rebuild(terms)
+            self.topic_heap.topics = {
+                doc_id: (score, titles[doc_id]) for doc_id, score in zip(doc_ids, scores)
+            }
+            self.topic_heap.compact()
+            self.decay.epoch = decay_epoch
+            self.suggestions.titles = titles
+            self.suggestions.title_words = title_words
+            self.suggestions.completions = completions
+            self.comment_words = comment_words
+            self.comment_fuzzy.rebuild(comment_words.terms)
+            self.comment_topics = comment_topics
+            self.comment_count = sum(1 for topic_id in comment_topics if topic_id)
+            self.high_water = reader.high_water
+        return True
     
     def _tokenize(self, text):
-        """Convert text to lowercase tokens"""
-        if not text:
-            return []
-        return text.lower().split()
+        """Convert text to normalized, stemmed index terms"""
+        return self.analyzer.analyze(text)
     
-    def search(self, query, limit=10):
-        """Search topics by keyword"""
+    def search(self, query, limit=10, mode="or", fuzzy=False):
+        """Search topics by keyword, returning topic IDs ranked by relevance"""
         tokens = self._tokenize(query)
         if not tokens:
             return []
         
-        # Use cache if available
-        cache_key = f"search:{query.lower()}"
-        cached = redis_client.get(cache_key)
-        if cached:
-            return eval(cached)  # Convert string to list
+        def compute():
+            # The change feed thread mutates the index while requests search it
+            with self.lock:
+                ranked = self.index.search(self._expand(tokens, self.trie, self.fuzzy, fuzzy), mode=mode, limit=limit)
+            return [topic_id for topic_id, _ in ranked]
         
-        # Search using Trie
-        results = set()
-        for token in tokens:
-            token_results = self.trie.search(token)
-            results.update(token_results)
+        cache_key = f"search:{mode}:{int(fuzzy)}:{limit}:{' '.join(tokens)}"
+        return result_cache.get_or_compute(cache_key, compute, SEARCH_CACHE_TTL, SEARCH_CACHE_STALE_TTL)
+    
+    def search_with_comments(self, query, limit=10, mode="or", fuzzy=False):
+        """
+        Search topics and their comments together. Returns up to `limit`
+        (topic_id, comment_id) pairs, best first; comment_id is the best
+        matching comment of that topic, or None if only the topic matched.
+        """
+        tokens = self._tokenize(query)
+        if not tokens:
+            return []
         
-        # Limit results
-        limited_results = list(results)[:limit]
+        def compute():
+            # Over-fetch both sides so merging them still yields a good top `limit`
+            depth = limit * 3
+            with self.lock:
+                topic_hits = dict(self.index.search(self._expand(tokens, self.trie, self.fuzzy, fuzzy), mode=mode, limit=depth))
+                comment_hits = self._search_comments(self._expand(tokens, self.comment_words, self.comment_fuzzy, fuzzy), mode, depth)
+            
+            scores = {
+                topic_id: topic_hits.get(topic_id, 0.0) + COMMENT_SCORE_WEIGHT * comment_hits.get(topic_id, (0.0, None))[0]
+                for topic_id in topic_hits.keys() | comment_hits.keys()
+            }
+            ranked = heapq.nlargest(limit, scores, key=lambda topic_id: (scores[topic_id], -topic_id))
+            return [(topic_id, comment_hits.get(topic_id, (0.0, None))[1]) for topic_id in ranked]
         
-        # Cache results
-        redis_client.setex(cache_key, 60, str(limited_results))  # 1 minute TTL
+        cache_key = f"search:comments:{mode}:{int(fuzzy)}:{limit}:{' '.join(tokens)}"
+        cached = result_cache.get_or_compute(cache_key, compute, SEARCH_CACHE_TTL, SEARCH_CACHE_STALE_TTL)
+        return [tuple(hit) for hit in cached]
+    
+    def _expand(self, tokens, dictionary, fuzzy_index, fuzzy):
+        """
+        Expand each token to the terms of `dictionary` it prefixes (and, in
+        fuzzy mode, the terms of `fuzzy_index` within a small edit distance
+        that are still in the dictionary). The resulting groups are ranked
+        as a union (or intersection) of their posting lists.
+        """
+        term_groups = []
+        for token in tokens:
+            terms = dictionary.words_with_prefix(token, MAX_PREFIX_EXPANSIONS)
+            if fuzzy:
+                terms = list(dict.fromkeys(terms + [
+                    term for term, _ in fuzzy_index.search(token, limit=MAX_FUZZY_EXPANSIONS)
+                    if term in dictionary
+                ]))
+            term_groups.append(terms)
+        return term_groups
+    
+    def _search_comments(self, term_groups, mode, limit):
+        """Best matching comment per topic as {topic_id: (score, comment_id)}"""
+        n = max(self.comment_count, 1)
+        scores = None
+        for terms in term_groups:
+            # A comment scores the idf of the rarest term it matches in this group
+            group_scores = {}
+            for term in terms:
+                comment_ids = self.comment_words.get(term)
+                if not comment_ids:
+                    continue
+                idf = math.log(1 + (n - len(comment_ids) + 0.5) / (len(comment_ids) + 0.5))
+                for comment_id in comment_ids:
+                    if idf > group_scores.get(comment_id, 0.0):
+                        group_scores[comment_id] = idf
+            
+            if scores is None:
+                scores = group_scores
+            elif mode == "and":
+                scores = {
+                    comment_id: score + group_scores[comment_id]
+                    for comment_id, score in scores.items() if comment_id in group_scores
+                }
+            else:
+                for comment_id, score in group_scores.items():
+                    scores[comment_id] = scores.get(comment_id, 0.0) + score
         
-        return limited_results
+        # Group by topic, keeping each topic's best comment
+        best = {}
+        comment_topics = self.comment_topics
+        for comment_id, score in (scores or {}).items():
+            topic_id = comment_topics[comment_id] if comment_id < len(comment_topics) else 0
+            if topic_id and topic_id in self.index and score > best.get(topic_id, (0.0, None))[0]:
+                best[topic_id] = (score, comment_id)
+        top = heapq.nlargest(limit, best, key=lambda topic_id: best[topic_id][0])
+        return {topic_id: best[topic_id] for topic_id in top}
+    
+    def suggest(self, prefix, limit=10):
+        """Typeahead completions for a title prefix, answered from memory"""
+        with self.lock:
+            suggestions = self.suggestions.suggest(prefix, limit)
+        for suggestion in suggestions:
+            suggestion["score"] = round(self.decay.value(suggestion["score"]), 3)
+        return suggestions
     
     # 
     def get_trending_topics(self, limit=10):
-        """Get top trending topics"""
-        cache_key = "trending_topics"
-        cached = redis_client.get(cache_key)
-        if cached:
-            try:
-                return eval(cached)  # Convert string to list
-            except:
-                # Invalid cache, continue to get fresh data
-                pass
+        """Get top trending topics across all workers (this worker's view if Redis is down)"""
+        return result_cache.get_or_compute(
+            f"trending:{limit}",
+            lambda: self._compute_trending(limit),
+            TRENDING_CACHE_TTL,
+            TRENDING_CACHE_STALE_TTL
+        )
+    
+    def _compute_trending(self, limit):
+        trending = None
+        try:
+            # Over-fetch a little in case a just-created topic is not indexed here yet
+            ranked = self.leaderboard.top(limit + 10)
+            trending = []
+            for member, score in ranked:
+                entry = self.topic_heap.topics.get(int(member))
+                if entry is None:
+                    continue
+                trending.append({"id": int(member), "title": entry[1], "score": round(score, 3)})
+                if len(trending) == limit:
+                    break
+        except redis.RedisError as e:
+            print(f"Error reading shared trending scores: {e}")
         
-        # Get trending topics from heap
-        trending = self.topic_heap.get_top_topics(limit)
+        if trending is None:
+            # Fall back to the local heap, reporting current decayed scores
+            trending = self.topic_heap.get_top_topics(limit)
+            for topic in trending:
+                topic["score"] = round(self.decay.value(topic["score"]), 3)
         
         # If no trending topics yet, return some default ones
         if not trending:
             # Get recent topics from database
-            db = next(get_db())
-            recent_topics = db.query(Topic).order_by(Topic.created_at.desc()).limit(limit).all()
+            db = SessionLocal()
+            try:
+                recent_topics = db.query(Topic.id, Topic.title, Topic.view_count).order_by(
+                    Topic.created_at.desc()
+                ).limit(limit).all()
+            finally:
+                db.close()
             
             # Convert to trending format
             trending = [
                 {
-                    "id": topic.id,
-                    "title": topic.title,
-                    "score": topic.view_count or 1
+                    "id": topic_id,
+                    "title": title,
+                    "score": view_count or 1
                 }
-                for topic in recent_topics
+                for topic_id, title, view_count in recent_topics
             ]
         
-        # Cache results
-        redis_client.setex(cache_key, 300, str(trending))  # 5 minutes TTL
-        
         return trending
         
     def increment_topic_view(self, topic_id):
@@ -117,8 +779,8 @@ class SearchService:
         # Update in Redis
         redis_client.hincrby(f"topic:{topic_id}", "views", 1)
         
-        # Update in heap
-        self.topic_heap.increment_score(topic_id)
+        # Update decayed trending score
+        self._record_activity(topic_id)
 
 # Global search service instance
 search_service = SearchService()
\ No newline at end of file
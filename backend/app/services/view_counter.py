@@ -0,0 +1,131 @@
+import threading
+import time
+import redis
+from sqlalchemy import bindparam, func, update
+from app.models import SessionLocal
+from app.models.topic import Topic
+from app.services.cache_service import acquire_lock, release_lock
+from app.config import settings
+
+# Redis client for view counts
+redis_client = redis.Redis(
+    host=settings.REDIS_HOST,
+    port=settings.REDIS_PORT,
+    decode_responses=True
+)
+
+PENDING_KEY = "topic_views:pending"      # topic_id -> views not yet in Postgres
+FLUSHING_KEY = "topic_views:flushing"    # batch being written by a flusher
+FLUSH_LOCK_KEY = "topic_views:flush_lock"
+
+# Single statement run once per topic in the batch (executemany). updated_at is
+# set to itself so the column's onupdate does not mark the topic as edited.
+_FLUSH_STATEMENT = (
+    update(Topic.__table__)
+    .where(Topic.__table__.c.id == bindparam("topic_id"))
+    .values(
+        view_count=func.coalesce(Topic.__table__.c.view_count, 0) + bindparam("views"),
+        updated_at=Topic.__table__.c.updated_at
+    )
+)
+
+class ViewCounter:
+    """
+    Write-behind topic view counter.
+
+    Views are accumulated with HINCRBY in a Redis hash instead of updating the
+    topic row on every read, and a background flusher periodically moves them
+    to ``topics.view_count`` in one batched UPDATE. The accumulator lives in
+    Redis, so views survive a worker crash: a flusher first RENAMEs the
+    pending hash to a flushing hash (atomically, so new views keep landing in
+    a fresh pending hash) and only deletes it after the transaction commits;
+    a batch left behind by a crash is written by the next flush. A crash
+    between the commit and the delete counts that batch twice, which is
+    acceptable for a view counter.
+    """
+
+    def __init__(self, interval_seconds=None):
+        self.interval = interval_seconds if interval_seconds is not None else settings.VIEW_FLUSH_INTERVAL_SECONDS
+        self.flushed = 0
+
+    def record(self, topic_id):
+        """Count one view; returns the views of this topic not yet flushed"""
+        pipe = redis_client.pipeline()
+        pipe.hincrby(PENDING_KEY, topic_id, 1)
+        pipe.hget(FLUSHING_KEY, topic_id)
+        pending, flushing = pipe.execute()
+        return pending + int(flushing or 0)
+
+    def pending(self, topic_ids):
+        """Unflushed views for several topics, as {topic_id: views}"""
+        topic_ids = list(topic_ids)
+        if not topic_ids:
+            return {}
+        try:
+            pipe = redis_client.pipeline()
+            pipe.hmget(PENDING_KEY, topic_ids)
+            pipe.hmget(FLUSHING_KEY, topic_ids)
+            pending, flushing = pipe.execute()
+        except redis.RedisError as e:
+            print(f"Error reading pending view counts: {e}")
+            return {}
+        return {
+            topic_id: int(a or 0) + int(b or 0)
+            for topic_id, a, b in zip(topic_ids, pending, flushing)
+        }
+
+    def flush(self):
+        """Write accumulated views to Postgres; returns the number of views written"""
+        # One flusher at a time across workers, or two could write the same batch
+        lock_ttl = max(60, self.interval * 2)
+        token = acquire_lock(FLUSH_LOCK_KEY, lock_ttl, client=redis_client)
+        if token is None:
+            return 0
+        try:
+            # Finish a batch left behind by a crashed flusher before taking a new one
+            if not redis_client.exists(FLUSHING_KEY):
+                try:
+                    redis_client.rename(PENDING_KEY, FLUSHING_KEY)
+                except redis.ResponseError:
+                    return 0  # nothing pending
+
+            batch = redis_client.hgetall(FLUSHING_KEY)
+            rows = [
+                {"topic_id": int(topic_id), "views": int(views)}
+                for topic_id, views in batch.items()
+                if int(views)
+            ]
+            if rows:
+                db = SessionLocal()
+                try:
+                    db.execute(_FLUSH_STATEMENT, rows)
+                    db.commit()
+                finally:
+                    db.close()
+            redis_client.delete(FLUSHING_KEY)
+
+            written = sum(row["views"] for row in rows)
+            self.flushed += written
+            return written
+        finally:
+            # Atomic compare-and-delete: after a GET the lock could expire
+            # and pass to another flusher before our DEL removed it
+            release_lock(FLUSH_LOCK_KEY, token, client=redis_client)
+
+    def run(self):
+        """Flush forever (meant for a daemon thread), starting with any leftovers"""
+        while True:
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error flushing view counts: {e}")
+            time.sleep(self.interval)
+
+    def start(self):
+        thread = threading.Thread(target=self.run)
+        thread.daemon = True
+        thread.start()
+        return thread
+
+# Global view counter instance
+view_counter = ViewCounter()
@@ -0,0 +1,78 @@
+import re
+import unicodedata
+from typing import FrozenSet, List, Optional
+
+ENGLISH_STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been
+before being below between both but by can could did do does doing down during
+each few for from further had has have having he her here hers herself him
+himself his how i if in into is it its itself just me more most my myself no
+nor not now of off on once only or other our ours ourselves out over own same
+she should so some such than that the their theirs them themselves then there
+these they this those through to too under until up very was we were what when
+where which while who whom why will with would you your yours yourself
+yourselves
+""".split())
+
+_WORD = re.compile(r"\w+")
+_VOWELS = set("aeiouy")
+
+def light_stem(word: str) -> str:
+    """
+    Conservative English suffix stripping: plurals, -ing and -ed.
+    Deliberately much lighter than Porter so prefix search on the stemmed
+    terms still behaves predictably.
+    """
+    if len(word) <= 3 or not word.isalpha():
+        return word
+
+    if word.endswith("ies") and len(word) > 4:
+        return word[:-3] + "y"
+    if word.endswith("sses"):
+        return word[:-2]
+    if word.endswith("es") and word[-3] in "sxz" or word.endswith(("ches", "shes")):
+        return word[:-2]
+    if word.endswith("s") and word[-2] not in "sui":
+        return word[:-1]
+
+    for suffix, min_length in (("ing", 6), ("ed", 5)):
+        if word.endswith(suffix) and len(word) >= min_length and not word.endswith("eed"):
+            stem = word[:-len(suffix)]
+            if len(stem) < 3 or not _VOWELS.intersection(stem):
+                return word
+            # running -> run, stopped -> stop
+            if stem[-1] == stem[-2] and stem[-1] not in "lsz" and stem[-1] not in _VOWELS:
+                stem = stem[:-1]
+            return stem
+    return word
+
+class Analyzer:
+    """
+    Text analysis shared by indexing and querying: Unicode normalization,
+    case folding, accent and punctuation stripping, stopword removal and
+    light stemming. Both sides must use the same configuration.
+    """
+
+    def __init__(self, stopwords: Optional[FrozenSet[str]] = ENGLISH_STOPWORDS, stemming: bool = True):
+        self.stopwords = stopwords or frozenset()
+        self.stemming = stemming
+
+    @property
+    def signature(self) -> str:
+        """Identifies the configuration, so indexes built differently are not mixed"""
+        return f"v1:stopwords={len(self.stopwords)}:stemming={int(self.stemming)}"
+
+    def normalize(self, text: str) -> str:
+        text = unicodedata.normalize("NFKD", text.casefold())
+        return "".join(char for char in text if not unicodedata.combining(char))
+
+    def analyze(self, text: Optional[str]) -> List[str]:
+        """Convert text to index terms, keeping duplicates (they carry term frequency)"""
+        if not text:
+            return []
+        terms = []
+        for word in _WORD.findall(self.normalize(text)):
+            if word in self.stopwords:
+                continue
+            terms.append(light_stem(word) if self.stemming else word)
+        return terms
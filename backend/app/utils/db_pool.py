@@ -0,0 +1,96 @@
+import threading
+import time
+from collections import deque
+from typing import Dict
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+class PoolMetrics:
+    """Checkout counters and recent wait times of one connection pool"""
+
+    def __init__(self, window: int = 1024):
+        self.lock = threading.Lock()
+        self.checkouts = 0
+        self.overflow_events = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.recent_waits = deque(maxlen=window)
+
+    def record_checkout(self, wait: float, overflowed: bool):
+        with self.lock:
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self.recent_waits.append(wait)
+            if overflowed:
+                self.overflow_events += 1
+
+    def record_timeout(self):
+        with self.lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> Dict:
+        with self.lock:
+            waits = sorted(self.recent_waits)
+            checkouts = self.checkouts
+            return {
+                "checkouts": checkouts,
+                "overflow_events": self.overflow_events,
+                "timeouts": self.timeouts,
+                "wait_ms_avg": round(1000 * self.total_wait / checkouts, 3) if checkouts else None,
+                "wait_ms_max": round(1000 * self.max_wait, 3),
+                "wait_ms_p99_recent": round(1000 * waits[int(0.99 * (len(waits) - 1))], 3) if waits else None
+            }
+
+class _InstrumentedPool:
+    """
+    Mixin timing every checkout, i.e. how long a request waited for a
+    connection (opening a new one included), and counting checkouts that
+    needed an overflow connection or timed out.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        overflow_before = self.overflow()
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_timeout()
+            raise
+        # overflow() counts up from -pool_size as connections are opened, so
+        # only an increase past zero is a connection beyond pool_size
+        overflow = self.overflow()
+        self.metrics.record_checkout(time.perf_counter() - start, overflow > 0 and overflow > overflow_before)
+        return connection
+
+    def recreate(self):
+        # Keep the counters when the engine replaces its pool (dispose, invalidation)
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+class InstrumentedQueuePool(_InstrumentedPool, QueuePool):
+    pass
+
+class InstrumentedAsyncQueuePool(_InstrumentedPool, AsyncAdaptedQueuePool):
+    pass
+
+def pool_status(pool) -> Dict:
+    """Current occupancy and checkout metrics of an engine's pool"""
+    metrics = getattr(pool, "metrics", None)
+    if metrics is None:
+        # NullPool: every checkout opens a connection, typically to an external pooler
+        return {"pool": type(pool).__name__}
+    return {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(0, pool.overflow()),
+        **metrics.snapshot()
+    }
@@ -0,0 +1,113 @@
+from array import array
+from collections import Counter
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Tuple
+
+def trigrams(term: str) -> List[str]:
+    """Distinct trigrams of a term padded with boundary markers"""
+    padded = f"${term}$"
+    return list(dict.fromkeys(padded[i:i + 3] for i in range(len(padded) - 2)))
+
+def max_edits_for(term: str) -> int:
+    """
+    Edit budget that still keeps short words meaningful: none below four
+    characters (one edit turns "cat" into dozens of words), one up to nine,
+    two beyond.
+    """
+    if len(term) <= 3:
+        return 0
+    if len(term) <= 9:
+        return 1
+    return 2
+
+def bounded_distance(a: str, b: str, max_distance: int) -> Optional[int]:
+    """
+    Optimal string alignment distance (Levenshtein plus adjacent
+    transpositions) between a and b, or None as soon as it must exceed
+    max_distance. Only a diagonal band of the DP matrix is computed.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return None
+    big = max_distance + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [big] * (len(b) + 1)
+        current[0] = i
+        lo = max(1, i - max_distance)
+        hi = min(len(b), i + max_distance)
+        for j in range(lo, hi + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if previous2 is not None and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value
+        if min(current[lo - 1:hi + 1]) > max_distance:
+            return None
+        previous2, previous = previous, current
+    return previous[-1] if previous[-1] <= max_distance else None
+
+class FuzzyIndex:
+    """
+    Typo-tolerant term lookup.
+
+    Terms are assigned integer IDs and every trigram keeps an ``array('I')``
+    of the terms containing it. A query only verifies terms that share
+    enough trigrams with it to possibly be within the edit budget (each
+    edit or transposition destroys at most four of the query's trigrams),
+    so the cost depends on the length of a handful of trigram lists rather
+    than on the vocabulary size. Terms are never removed here; callers
+    filter matches against their live dictionary and rebuild on compaction.
+    """
+
+    def __init__(self):
+        self.terms: List[str] = []            # term ID -> term
+        self.grams: Dict[str, array] = {}     # trigram -> term IDs
+
+    def __len__(self):
+        return len(self.terms)
+
+    def add(self, term: str):
+        """Register a term (call once when it enters the dictionary)"""
+        term_id = len(self.terms)
+        self.terms.append(term)
+        for gram in trigrams(term):
+            ids = self.grams.get(gram)
+            if ids is None:
+                ids = self.grams[gram] = array("I")
+            ids.append(term_id)
+
+    def rebuild(self, terms: Iterable[str]):
+        """Replace the contents with exactly `terms`, dropping dead entries"""
+        self.terms = []
+        self.grams = {}
+        for term in terms:
+            self.add(term)
+
+    def search(self, query: str, max_distance: Optional[int] = None, limit: int = 20) -> List[Tuple[str, int]]:
+        """Return up to `limit` (term, distance) pairs within the edit budget, closest first"""
+        if max_distance is None:
+            max_distance = max_edits_for(query)
+        query_grams = trigrams(query)
+        # Short queries may share a single trigram with a match. That barely
+        # prunes, but bounded_distance rejects candidates of the wrong length
+        # at once; what one trigram can't catch is a transposition in the
+        # middle of a four-letter word ("form" -> "from"), which shares none.
+        threshold = max(1, len(query_grams) - 4 * max_distance)
+
+        lists = [self.grams[gram] for gram in query_grams if gram in self.grams]
+        counts = Counter(chain.from_iterable(lists))
+
+        matches = {}
+        terms = self.terms
+        for term_id, shared in counts.items():
+            if shared < threshold:
+                continue
+            term = terms[term_id]
+            if term in matches:
+                continue
+            distance = bounded_distance(query, term, max_distance)
+            if distance is not None:
+                matches[term] = distance
+        return sorted(matches.items(), key=lambda item: (item[1], item[0]))[:limit]
+
@@ -2,50 +2,136 @@ import heapq
 from typing import List, Dict, Tuple
 
 class TopicHeap:
+    """
+    Indexed (addressable) max-heap of topics by score.
+
+    Every live topic has exactly one heap slot and ``position`` maps its ID
+    to that slot, so score changes and removals are done in place in
+    O(log n) and memory is bounded by the number of live topics. Ties are
+    broken by the lower topic ID.
+    """
+
     def __init__(self):
-        self.topics = {}  # topic_id -> (score, title)
-        self.heap = []    # max-heap of (-score, topic_id)
-    
-    def add_topic(self, topic_id: int, score: int, title: str):
-        """Add a topic to the heap with its score"""
+        self.topics = {}    # topic_id -> (score, title)
+        self.heap = []      # topic IDs in max-heap order
+        self.position = {}  # topic_id -> index in self.heap
+
+    def __len__(self):
+        return len(self.heap)
+
+    def _key(self, topic_id: int) -> Tuple:
+        return (self.topics[topic_id][0], -topic_id)
+
+    def add_topic(self, topic_id: int, score: float, title: str):
+        """Add a topic to the heap with its score (or reset an existing one's)"""
         self.topics[topic_id] = (score, title)
-        heapq.heappush(self.heap, (-score, topic_id))
-    
-    def increment_score(self, topic_id: int):
+        if topic_id in self.position:
+            self._restore(self.position[topic_id])
+        else:
+            self.heap.append(topic_id)
+            self.position[topic_id] = len(self.heap) - 1
+            self._sift_up(len(self.heap) - 1)
+
+    def set_title(self, topic_id: int, title: str):
+        """Update a topic's title without touching its score"""
+        if topic_id in self.topics:
+            score, _ = self.topics[topic_id]
+            self.topics[topic_id] = (score, title)
+
+    def remove_topic(self, topic_id: int):
+        """Remove a topic and its heap slot"""
+        if self.topics.pop(topic_id, None) is None:
+            return
+        index = self.position.pop(topic_id)
+        last = self.heap.pop()
+        if index < len(self.heap):
+            self.heap[index] = last
+            self.position[last] = index
+            self._restore(index)
+
+    def compact(self):
+        """Rebuild the heap from ``topics`` (e.g. after replacing it wholesale)"""
+        self.heap = sorted(self.topics, key=self._key, reverse=True)
+        self.position = {topic_id: index for index, topic_id in enumerate(self.heap)}
+
+    def increment_score(self, topic_id: int, amount: float = 1):
         """Increment the score of a topic"""
         if topic_id in self.topics:
             score, title = self.topics[topic_id]
-            new_score = score + 1
-            self.topics[topic_id] = (new_score, title)
-            
-            # Add a new entry with updated score
-            # (We don't remove old entries, will be filtered during get_top_topics)
-            heapq.heappush(self.heap, (-new_score, topic_id))
-    
+            self.topics[topic_id] = (score + amount, title)
+            self._restore(self.position[topic_id])
+
+    def scale_scores(self, factor: float):
+        """Multiply every score by a positive factor; heap order is unchanged"""
+        self.topics = {
+            topic_id: (score * factor, title) for topic_id, (score, title) in self.topics.items()
+        }
+
+    def get_score(self, topic_id: int) -> float:
+        """Return the current score of a topic (0 if unknown)"""
+        entry = self.topics.get(topic_id)
+        return entry[0] if entry else 0
+
     def get_top_topics(self, limit: int) -> List[Dict]:
-        """Get the top N topics by score"""
-        seen = set()
+        """Get the top N topics by score in O(limit log limit), without copying the heap"""
         result = []
-        
-        # Create a copy of the heap to not modify the original
-        temp_heap = self.heap.copy()
-        
-        while temp_heap and len(result) < limit:
-            neg_score, topic_id = heapq.heappop(temp_heap)
-            
-            # Skip if we've seen this topic already
-            if topic_id in seen:
-                continue
-            
-            seen.add(topic_id)
-            
-            # Get current score (could be updated since it was added to heap)
-            current_score, title = self.topics[topic_id]
-            
+        if not self.heap:
+            return result
+
+        # Best-first walk of the heap: the next best topic is always the root
+        # or a child of an already emitted slot
+        frontier = [(self._negated_key(0), 0)]
+        while frontier and len(result) < limit:
+            _, index = heapq.heappop(frontier)
+            topic_id = self.heap[index]
+            score, title = self.topics[topic_id]
             result.append({
                 "id": topic_id,
                 "title": title,
-                "score": current_score
+                "score": score
             })
-        
-        return result
\ No newline at end of file
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < len(self.heap):
+                    heapq.heappush(frontier, (self._negated_key(child), child))
+
+        return result
+
+    def _negated_key(self, index: int) -> Tuple:
+        score, negated_id = self._key(self.heap[index])
+        return (-score, -negated_id)
+
+    def _higher(self, i: int, j: int) -> bool:
+        return self._key(self.heap[i]) > self._key(self.heap[j])
+
+    def _swap(self, i: int, j: int):
+        heap = self.heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self.position[heap[i]] = i
+        self.position[heap[j]] = j
+
+    def _restore(self, index: int):
+        """Re-establish heap order after the key at index changed either way"""
+        if index > 0 and self._higher(index, (index - 1) // 2):
+            self._sift_up(index)
+        else:
+            self._sift_down(index)
+
+    def _sift_up(self, index: int):
+        while index > 0:
+            parent = (index - 1) // 2
+            if not self._higher(index, parent):
+                break
+            self._swap(index, parent)
+            index = parent
+
+    def _sift_down(self, index: int):
+        size = len(self.heap)
+        while True:
+            best = index
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < size and self._higher(child, best):
+                    best = child
+            if best == index:
+                break
+            self._swap(index, best)
+            index = best
@@ -0,0 +1,117 @@
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import zlib
+from array import array
+from typing import Dict, List, Union
+
+# File layout (all integers little endian):
+#   header   MAGIC, VERSION, byte order flag, high-water marker (float64),
+#            section count, CRC-32 of the whole file (computed with this field zeroed)
+#   table    one (name, offset, length) entry per section
+#   sections raw array / string blobs, each aligned to 8 bytes
+# Array sections are stored in native machine layout, so a reader can use
+# them straight from the memory map with memoryview.cast() instead of copying.
+MAGIC = b"FORUMIDX"
+VERSION = 3
+_HEADER = struct.Struct("<8sIBdII")
+_CRC_OFFSET = _HEADER.size - 4
+_ENTRY = struct.Struct("<16sQQ")
+_ALIGN = 8
+_BYTE_ORDER = 0 if sys.byteorder == "little" else 1
+
+Section = Union[array, bytes]
+
+class SnapshotError(Exception):
+    """Raised when a snapshot is missing, corrupt or from another version"""
+
+def encode_strings(strings: List[str]) -> bytes:
+    """Pack strings into one blob, each terminated by NUL"""
+    return "".join(s.replace("\0", " ") + "\0" for s in strings).encode("utf-8")
+
+def write_snapshot(path: str, sections: Dict[str, Section], high_water: float):
+    """Atomically write named sections and a high-water marker to path"""
+    blobs = [(name, bytes(data) if isinstance(data, bytes) else data.tobytes()) for name, data in sections.items()]
+    offset = _HEADER.size + _ENTRY.size * len(blobs)
+    table = []
+    for name, blob in blobs:
+        offset += -offset % _ALIGN
+        table.append(_ENTRY.pack(name.encode("ascii"), offset, len(blob)))
+        offset += len(blob)
+
+    # Everything after the header, padding included, exactly as written
+    chunks = [b"".join(table)]
+    position = _HEADER.size + len(chunks[0])
+    for name, blob in blobs:
+        padding = b"\0" * (-position % _ALIGN)
+        chunks += [padding, blob]
+        position += len(padding) + len(blob)
+    crc = zlib.crc32(_HEADER.pack(MAGIC, VERSION, _BYTE_ORDER, high_water, len(blobs), 0))
+    for chunk in chunks:
+        crc = zlib.crc32(chunk, crc)
+
+    # A private temp file in the same directory: concurrent writers (other
+    # workers) never share it, and os.replace stays a same-filesystem rename
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, _BYTE_ORDER, high_water, len(blobs), crc))
+            for chunk in chunks:
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+class SnapshotReader:
+    """Read-only, memory-mapped view of a snapshot file"""
+
+    def __init__(self, path: str):
+        try:
+            with open(path, "rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise SnapshotError(f"Cannot open snapshot {path}: {e}")
+
+        if len(self._mmap) < _HEADER.size:
+            raise SnapshotError("Snapshot truncated")
+        magic, version, byte_order, self.high_water, count, crc = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION or byte_order != _BYTE_ORDER:
+            raise SnapshotError(f"Unsupported snapshot (magic={magic!r}, version={version})")
+        # Catches torn or mixed writes that still parse
+        actual = zlib.crc32(self._mmap[:_CRC_OFFSET])
+        actual = zlib.crc32(b"\0\0\0\0", actual)
+        with memoryview(self._mmap) as data:
+            actual = zlib.crc32(data[_HEADER.size:], actual)
+        if actual != crc:
+            raise SnapshotError("Snapshot checksum mismatch")
+
+        self._sections = {}
+        for i in range(count):
+            name, offset, length = _ENTRY.unpack_from(self._mmap, _HEADER.size + i * _ENTRY.size)
+            if offset + length > len(self._mmap):
+                raise SnapshotError("Snapshot truncated")
+            self._sections[name.rstrip(b"\0").decode("ascii")] = (offset, length)
+
+    def _view(self, name: str) -> memoryview:
+        if name not in self._sections:
+            raise SnapshotError(f"Snapshot has no section {name!r}")
+        offset, length = self._sections[name]
+        return memoryview(self._mmap)[offset:offset + length]
+
+    def array(self, name: str, typecode: str) -> memoryview:
+        """Zero-copy typed view of an array section"""
+        return self._view(name).cast(typecode)
+
+    def strings(self, name: str) -> List[str]:
+        """Decode a NUL terminated string section"""
+        return bytes(self._view(name)).decode("utf-8").split("\0")[:-1]
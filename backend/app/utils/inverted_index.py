@@ -0,0 +1,135 @@
+import heapq
+import math
+from typing import Dict, Iterable, List, Tuple
+
+class InvertedIndex:
+    """Term -> posting list index with BM25 ranking"""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[int, int]] = {}  # term -> {doc_id: term frequency}
+        self.doc_lengths: Dict[int, int] = {}          # doc_id -> number of terms
+        self.doc_terms: Dict[int, Tuple[str, ...]] = {}  # doc_id -> distinct terms
+        self.total_length = 0
+
+    def __len__(self):
+        return len(self.doc_lengths)
+
+    def __contains__(self, doc_id: int):
+        return doc_id in self.doc_lengths
+
+    def add_document(self, doc_id: int, terms: Iterable[str]):
+        """Index a document's terms, replacing any previously indexed version"""
+        counts: Dict[str, int] = {}
+        for term in terms:
+            counts[term] = counts.get(term, 0) + 1
+
+        # Only touch the postings that actually changed
+        for term in self.doc_terms.get(doc_id, ()):
+            if term not in counts:
+                self._drop_posting(term, doc_id)
+        for term, tf in counts.items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = {}
+            postings[doc_id] = tf
+
+        length = sum(counts.values())
+        self.total_length += length - self.doc_lengths.get(doc_id, 0)
+        self.doc_lengths[doc_id] = length
+        self.doc_terms[doc_id] = tuple(counts)
+
+    def remove_document(self, doc_id: int):
+        """Drop every posting of a document"""
+        for term in self.doc_terms.pop(doc_id, ()):
+            self._drop_posting(term, doc_id)
+        self.total_length -= self.doc_lengths.pop(doc_id, 0)
+
+    def _drop_posting(self, term: str, doc_id: int):
+        postings = self.postings.get(term)
+        if postings is None:
+            return
+        postings.pop(doc_id, None)
+        if not postings:
+            del self.postings[term]
+
+    def terms_of(self, doc_id: int) -> Tuple[str, ...]:
+        """Distinct terms currently indexed for a document"""
+        return self.doc_terms.get(doc_id, ())
+
+    def compact(self):
+        """Reallocate the dicts, which never shrink on their own after deletes"""
+        self.postings = {term: dict(postings) for term, postings in self.postings.items()}
+        self.doc_lengths = dict(self.doc_lengths)
+        self.doc_terms = dict(self.doc_terms)
+
+    def document_frequency(self, term: str) -> int:
+        """Number of documents containing the term"""
+        postings = self.postings.get(term)
+        return len(postings) if postings else 0
+
+    def _idf(self, doc_freq: int) -> float:
+        n = len(self.doc_lengths)
+        return math.log(1 + (n - doc_freq + 0.5) / (doc_freq + 0.5))
+
+    def search(self, term_groups: List[List[str]], mode: str = "or", limit: int = 10) -> List[Tuple[int, float]]:
+        """
+        Rank documents for a query.
+
+        Each entry of ``term_groups`` is one query token expanded to the index
+        terms it matches (e.g. the exact term plus prefix completions). In
+        ``"and"`` mode a document must match every group, in ``"or"`` mode any
+        of them. Returns up to ``limit`` ``(doc_id, score)`` pairs, best first.
+        """
+        if not term_groups or not self.doc_lengths:
+            return []
+
+        avg_length = self.total_length / len(self.doc_lengths)
+        k1, b = self.k1, self.b
+        doc_lengths = self.doc_lengths
+
+        # Resolve each group to the posting lists it touches
+        groups = []
+        for terms in term_groups:
+            lists = [self.postings[term] for term in terms if term in self.postings]
+            if not lists:
+                if mode == "and":
+                    return []
+                continue
+            groups.append(lists)
+        if not groups:
+            return []
+
+        # AND: only score documents present in every group, starting from the
+        # smallest group so the candidate set shrinks as fast as possible
+        candidates = None
+        if mode == "and":
+            groups.sort(key=lambda lists: sum(len(p) for p in lists))
+            for lists in groups:
+                group_docs = set()
+                for postings in lists:
+                    if candidates is None:
+                        group_docs.update(postings)
+                    else:
+                        group_docs.update(doc_id for doc_id in postings if doc_id in candidates)
+                candidates = group_docs
+                if not candidates:
+                    return []
+
+        scores: Dict[int, float] = {}
+        for lists in groups:
+            for postings in lists:
+                idf = self._idf(len(postings))
+                if candidates is not None and len(candidates) < len(postings):
+                    items = ((doc_id, postings[doc_id]) for doc_id in candidates if doc_id in postings)
+                else:
+                    items = postings.items()
+                for doc_id, tf in items:
+                    if candidates is not None and doc_id not in candidates:
+                        continue
+                    norm = k1 * (1 - b + b * doc_lengths[doc_id] / avg_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (k1 + 1) / (tf + norm)
+
+        # Top-k selection without sorting the whole candidate set
+        return heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
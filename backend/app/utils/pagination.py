@@ -0,0 +1,132 @@
+import base64
+import json
+from datetime import datetime
+from typing import Callable, List, NamedTuple, Optional, Sequence, Tuple
+from fastapi import HTTPException, Query, status
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.orm import aliased
+
+class Cursor(NamedTuple):
+    """
+    Position between two rows of a (created_at, id) ordered listing.
+    ``before`` cursors page backwards from the row, the others forwards.
+    """
+    created_at: datetime
+    id: int
+    before: bool = False
+
+def encode_cursor(cursor: Cursor) -> str:
+    """Opaque, URL safe token for a cursor"""
+    payload = [cursor.created_at.isoformat(), cursor.id, int(cursor.before)]
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+def decode_cursor(token: str) -> Cursor:
+    """Parse a token from encode_cursor; raises ValueError if it is malformed"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        created_at, row_id, before = json.loads(base64.urlsafe_b64decode(padded))
+        return Cursor(datetime.fromisoformat(created_at), int(row_id), bool(before))
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+
+def cursor_param(cursor: Optional[str] = Query(None, description="Opaque token from a previous page's links")) -> Optional[Cursor]:
+    """Dependency parsing the `cursor` query parameter"""
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+def _keyset_clauses(created_column, id_column, cursor: Optional[Cursor], descending: bool):
+    """The (where clause or None, order_by columns) of a keyset page"""
+    # Walking backwards means reading the listing in reverse order
+    backwards = cursor is not None and cursor.before
+    reverse = descending != backwards
+    condition = None
+    if cursor is not None:
+        key = tuple_(created_column, id_column)
+        position = tuple_(cursor.created_at, cursor.id)
+        condition = key < position if reverse else key > position
+    if reverse:
+        return condition, (created_column.desc(), id_column.desc())
+    return condition, (created_column.asc(), id_column.asc())
+
+def keyset_query(stmt, created_column, id_column, cursor: Optional[Cursor], limit: int, descending: bool = False):
+    """
+    Restrict and order stmt to the page after (or before) the cursor. The
+    row comparison lets the database seek straight to the position through
+    an index on (created_at, id), so deep pages cost the same as the first.
+    One extra row is fetched to tell whether another page exists.
+    """
+    condition, order = _keyset_clauses(created_column, id_column, cursor, descending)
+    if condition is not None:
+        stmt = stmt.where(condition)
+    return stmt.order_by(*order).limit(limit + 1)
+
+def keyset_window(
+    model,
+    partition_column,
+    created_column,
+    id_column,
+    partition_ids: Sequence,
+    cursor: Optional[Cursor],
+    limit: int,
+    descending: bool = False
+):
+    """
+    keyset_query for many parents at once: the same page (limit + 1 rows
+    after the cursor) of every partition_ids listing in one statement,
+    numbered with ROW_NUMBER() over each parent's rows. Returns a select
+    of `model` ordered by parent, then position, so keyset_page can be
+    applied to each parent's run of rows.
+    """
+    condition, order = _keyset_clauses(created_column, id_column, cursor, descending)
+    position = func.row_number().over(partition_by=partition_column, order_by=order).label("page_position")
+    inner = select(model, position).where(partition_column.in_(partition_ids))
+    if condition is not None:
+        inner = inner.where(condition)
+    window = inner.subquery()
+    return select(aliased(model, window)).where(
+        window.c.page_position <= limit + 1
+    ).order_by(
+        window.c[partition_column.key], window.c.page_position
+    )
+
+def keyset_page(
+    rows: Sequence,
+    cursor: Optional[Cursor],
+    limit: int,
+    key: Callable = lambda row: row
+) -> Tuple[List, Optional[str], Optional[str]]:
+    """
+    Turn the rows of a keyset_query into (page, next_token, prev_token).
+    `key` maps a row to the object carrying created_at and id.
+    """
+    rows = list(rows)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    backwards = cursor is not None and cursor.before
+    if backwards:
+        rows.reverse()
+    if not rows:
+        return rows, None, None
+
+    first, last = key(rows[0]), key(rows[-1])
+    # A page reached from a cursor always has a neighbour on the side it came from
+    has_next = has_more if not backwards else True
+    has_prev = has_more if backwards else cursor is not None
+    next_token = encode_cursor(Cursor(last.created_at, last.id)) if has_next else None
+    prev_token = encode_cursor(Cursor(first.created_at, first.id, before=True)) if has_prev else None
+    return rows, next_token, prev_token
+
+def set_page_headers(response, request, next_token: Optional[str], prev_token: Optional[str]):
+    """Expose the neighbouring pages as a Link header plus X-Next-Cursor / X-Prev-Cursor"""
+    links = []
+    for rel, token, header in (("next", next_token, "X-Next-Cursor"), ("prev", prev_token, "X-Prev-Cursor")):
+        if token:
+            url = request.url.remove_query_params("skip").include_query_params(cursor=token)
+            links.append(f'<{url}>; rel="{rel}"')
+            response.headers[header] = token
+    if links:
+        response.headers["Link"] = ", ".join(links)
@@ -0,0 +1,57 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+
+class QueryCounter:
+    """Number of SQL statements sent to the database within one scope"""
+
+    def __init__(self):
+        self.count = 0
+
+# The counter of the current request (or count_queries block). Being a
+# ContextVar it follows the request into the threadpool and into
+# SQLAlchemy's async greenlets, but not into background threads.
+_current: ContextVar[Optional[QueryCounter]] = ContextVar("query_counter", default=None)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    counter = _current.get()
+    if counter is not None:
+        counter.count += 1
+
+def install_query_counter(engine):
+    """Count the statements of a (sync) engine; pass async_engine.sync_engine for async ones"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+
+@contextmanager
+def count_queries():
+    """Count the statements executed inside the block: ``with count_queries() as c: ...; c.count``"""
+    counter = QueryCounter()
+    token = _current.set(counter)
+    try:
+        yield counter
+    finally:
+        _current.reset(token)
+
+class QueryCountMiddleware:
+    """ASGI middleware reporting each HTTP request's statement count in X-Query-Count"""
+
+    def __init__(self, app, header: str = "X-Query-Count"):
+        self.app = app
+        self.header = header.lower().encode("latin-1")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with count_queries() as counter:
+            async def send_with_count(message):
+                if message["type"] == "http.response.start":
+                    headers = list(message.get("headers", []))
+                    headers.append((self.header, str(counter.count).encode("latin-1")))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, send_with_count)
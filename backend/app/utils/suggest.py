@@ -0,0 +1,124 @@
+import heapq
+from typing import Callable, Dict, List
+from app.utils.trie import Trie
+
+class SuggestionIndex:
+    """
+    Precomputed top-k completions per prefix.
+
+    Every prefix (up to ``max_prefix_length`` characters) of a topic title and
+    of each word in it maps to the IDs of the ``k`` most popular topics with
+    that prefix, best first. Lookups are a single dict access; the lists are
+    kept current as scores change, so nothing is ranked at query time. A Trie
+    over titles and title words is only consulted to refill a list after a
+    topic is removed from it.
+    """
+
+    def __init__(self, score_of: Callable[[int], float], k: int = 10, max_prefix_length: int = 12):
+        self.score_of = score_of
+        self.k = k
+        self.max_prefix_length = max_prefix_length
+        self.completions: Dict[str, List[int]] = {}  # prefix -> topic IDs, best first
+        self.titles: Dict[int, str] = {}             # topic_id -> title
+        self.title_words = Trie()                    # normalized title and its words -> topic IDs
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return " ".join(text.lower().split())
+
+    def _words(self, title: str):
+        title = self.normalize(title)
+        return {title, *title.split()}
+
+    def _prefixes(self, title: str):
+        prefixes = set()
+        for word in self._words(title):
+            for end in range(1, min(len(word), self.max_prefix_length) + 1):
+                prefixes.add(word[:end])
+        return prefixes
+
+    def add(self, topic_id: int, title: str):
+        """Register (or re-title) a topic and place it in its prefixes' completions"""
+        old_title = self.titles.get(topic_id)
+        if old_title is not None:
+            if old_title == title:
+                return self.update(topic_id)
+            self.remove(topic_id)
+
+        self.titles[topic_id] = title
+        for word in self._words(title):
+            self.title_words.insert(word, topic_id)
+        self.update(topic_id)
+
+    def remove(self, topic_id: int):
+        """Drop a topic from every completion list it appears in"""
+        title = self.titles.pop(topic_id, None)
+        if title is None:
+            return
+
+        for word in self._words(title):
+            self.title_words.remove(word, topic_id)
+        for prefix in self._prefixes(title):
+            ranked = self.completions.get(prefix)
+            if not ranked or topic_id not in ranked:
+                continue
+            was_full = len(ranked) >= self.k
+            ranked.remove(topic_id)
+            if was_full:
+                # Topics that did not make the cut may now qualify
+                self._refill(prefix)
+            elif not ranked:
+                del self.completions[prefix]
+
+    def _refill(self, prefix: str):
+        candidates = self.title_words.search(prefix)
+        ranked = heapq.nlargest(self.k, candidates, key=self.score_of)
+        if ranked:
+            self.completions[prefix] = ranked
+        else:
+            self.completions.pop(prefix, None)
+
+    def update(self, topic_id: int):
+        """Re-rank a topic after its score changed"""
+        title = self.titles.get(topic_id)
+        if title is None:
+            return
+
+        score_of = self.score_of
+        score = score_of(topic_id)
+        for prefix in self._prefixes(title):
+            ranked = self.completions.get(prefix)
+            if ranked is None:
+                self.completions[prefix] = [topic_id]
+                continue
+            if topic_id in ranked:
+                ranked.remove(topic_id)
+            elif len(ranked) >= self.k and score <= score_of(ranked[-1]):
+                continue
+
+            # Lists hold at most k IDs, so a linear insert is cheapest
+            position = len(ranked)
+            while position > 0 and score_of(ranked[position - 1]) < score:
+                position -= 1
+            ranked.insert(position, topic_id)
+            del ranked[self.k:]
+
+    def _matches(self, topic_id: int, prefix: str) -> bool:
+        title = self.normalize(self.titles[topic_id])
+        return title.startswith(prefix) or any(word.startswith(prefix) for word in title.split())
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Dict]:
+        """Return the most popular topics whose title (or a word in it) starts with prefix"""
+        prefix = self.normalize(prefix)
+        ranked = self.completions.get(prefix[:self.max_prefix_length], ())
+        if len(prefix) > self.max_prefix_length:
+            # Only the first max_prefix_length characters are precomputed
+            ranked = [topic_id for topic_id in ranked if self._matches(topic_id, prefix)]
+        return [
+            {
+                "id": topic_id,
+                "title": self.titles[topic_id],
+                "score": self.score_of(topic_id)
+            }
+            for topic_id in ranked[:limit]
+        ]
@@ -0,0 +1,120 @@
+import time
+from typing import List, Optional, Tuple
+
+class ForwardDecay:
+    """
+    Exponentially time-decayed scores without ever rescanning them.
+
+    An event at time t adds ``2 ** ((t - epoch) / half_life)`` to a topic's
+    stored score instead of decaying every score as time passes. All stored
+    scores shrink by the same factor over time, so their order (and any heap
+    built on them) stays valid; the current decayed value is
+    ``stored / weight(now)``. When weights get large the epoch is moved
+    forward and scores are rescaled once (``rebase``), which also preserves
+    order.
+    """
+
+    # Rebase once weights reach 2**64, far from float overflow
+    MAX_EXPONENT = 64
+
+    def __init__(self, half_life_seconds: float, epoch: Optional[float] = None):
+        self.half_life = half_life_seconds
+        self.epoch = time.time() if epoch is None else epoch
+
+    def _exponent(self, at: float) -> float:
+        return (at - self.epoch) / self.half_life
+
+    def weight(self, at: Optional[float] = None) -> float:
+        """Stored-score contribution of one event at time `at` (default now)"""
+        return 2.0 ** self._exponent(time.time() if at is None else at)
+
+    def value(self, stored: float, at: Optional[float] = None) -> float:
+        """Decayed value of a stored score as of `at` (default now)"""
+        return stored / self.weight(at)
+
+    def needs_rebase(self, at: Optional[float] = None) -> bool:
+        return self._exponent(time.time() if at is None else at) > self.MAX_EXPONENT
+
+    def rebase(self, at: Optional[float] = None) -> float:
+        """Move the epoch to `at`; returns the factor stored scores must be multiplied by"""
+        at = time.time() if at is None else at
+        factor = 1.0 / self.weight(at)
+        self.epoch = at
+        return factor
+
+# Adds forward-decayed activity to a sorted set. The weight is computed inside
+# Redis from the shared epoch, so every worker agrees on it, and a rebase
+# (rescale every score, move the epoch) happens atomically with the update.
+#   KEYS: scores zset, epoch key
+#   ARGV: member, amount, event time, now, half-life, max exponent, "incr"|"seed"
+_RECORD_SCRIPT = """
+local now = tonumber(ARGV[4])
+local half_life = tonumber(ARGV[5])
+local epoch = tonumber(redis.call('GET', KEYS[2]))
+if not epoch then
+    epoch = now
+    redis.call('SET', KEYS[2], ARGV[4])
+end
+if (now - epoch) / half_life > tonumber(ARGV[6]) then
+    local factor = 2 ^ (-(now - epoch) / half_life)
+    redis.call('ZUNIONSTORE', KEYS[1], 1, KEYS[1], 'WEIGHTS', string.format('%.17g', factor))
+    redis.call('SET', KEYS[2], ARGV[4])
+    epoch = now
+end
+local amount = tonumber(ARGV[2]) * 2 ^ ((tonumber(ARGV[3]) - epoch) / half_life)
+if ARGV[7] == 'seed' then
+    return redis.call('ZADD', KEYS[1], 'NX', string.format('%.17g', amount), ARGV[1])
+end
+return redis.call('ZINCRBY', KEYS[1], string.format('%.17g', amount), ARGV[1])
+"""
+
+class SharedLeaderboard:
+    """
+    Cluster-wide forward-decayed leaderboard in a Redis sorted set.
+
+    Every worker increments the same set with ZINCRBY (through a script that
+    applies the forward-decay weight), so rankings reflect all traffic no
+    matter which worker served it. Reads are one ZREVRANGE plus the epoch.
+    Redis errors are left to the caller, which keeps a local fallback.
+    """
+
+    def __init__(self, client, key: str, half_life_seconds: float):
+        self.client = client
+        self.key = key
+        self.epoch_key = f"{key}:epoch"
+        self.half_life = half_life_seconds
+        self._script = client.register_script(_RECORD_SCRIPT)
+
+    def __len__(self):
+        return self.client.zcard(self.key)
+
+    def _call(self, member, amount, at, mode, client):
+        now = time.time()
+        at = now if at is None else at
+        return self._script(
+            keys=[self.key, self.epoch_key],
+            args=[member, amount, at, now, self.half_life, ForwardDecay.MAX_EXPONENT, mode],
+            client=client or self.client
+        )
+
+    def record(self, member, amount: float = 1, at: Optional[float] = None, client=None):
+        """Add `amount` of activity at time `at` (default now)"""
+        return self._call(member, amount, at, "incr", client)
+
+    def seed(self, member, amount: float, at: Optional[float] = None, client=None):
+        """Give a member its initial score, unless it already has one"""
+        return self._call(member, amount, at, "seed", client)
+
+    def remove(self, member, client=None):
+        (client or self.client).zrem(self.key, member)
+
+    def top(self, limit: int) -> List[Tuple[str, float]]:
+        """Top `limit` members with their current decayed values, best first"""
+        pipe = self.client.pipeline(transaction=False)
+        pipe.get(self.epoch_key)
+        pipe.zrevrange(self.key, 0, limit - 1, withscores=True)
+        epoch, ranked = pipe.execute()
+        if epoch is None:
+            return []
+        decay = ForwardDecay(self.half_life, float(epoch))
+        return [(member, decay.value(score)) for member, score in ranked]
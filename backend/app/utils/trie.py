@@ -1,40 +1,197 @@
-class TrieNode:
-    def __init__(self):
-        self.children = {}
-        self.is_end_of_word = False
-        self.topic_ids = set()  # Store topic IDs that contain this word
+from array import array
+from bisect import bisect_left, insort
+
+# Smallest write buffer (in distinct terms) before it is merged into the
+# sorted segment. The buffer may grow to 1/MERGE_RATIO of the segment so
+# merges stay amortized O(log n) per insert even during a bulk load.
+MIN_MERGE_THRESHOLD = 4096
+MERGE_RATIO = 8
+
+def _prefix_end(prefix):
+    """Smallest string greater than every string starting with prefix"""
+    return prefix + "\U0010ffff"
 
 class Trie:
+    """
+    Compact prefix index over words.
+
+    Instead of one node object per character, words live in a sorted term
+    list and their topic IDs in a single ``array('I')`` (CSR layout:
+    ``ids[offsets[i]:offsets[i + 1]]`` are the sorted IDs of ``terms[i]``).
+    A prefix is the contiguous range ``[prefix, prefix + U+10FFFF)`` of the
+    term list, found with two binary searches. New postings go to a small
+    sorted write buffer that is periodically merged into the arrays;
+    removals of merged postings are recorded as tombstones until then.
+    """
+
     def __init__(self):
-        self.root = TrieNode()
-    
+        self.terms = []                # sorted, merged words
+        self.offsets = array("I", [0])
+        self.ids = array("I")
+        self._pending_terms = []       # sorted words with buffered postings
+        self._pending = {}             # word -> set of topic IDs not yet merged
+        self._removed = {}             # word -> set of merged topic IDs since removed
+        self._removed_count = 0
+
+    @classmethod
+    def from_arrays(cls, terms, offsets, ids):
+        """
+        Build a trie from already merged, sorted data (e.g. a snapshot).
+        ``offsets`` and ``ids`` may be any sequence of ints, including
+        read-only memoryviews; they are replaced on the next compaction.
+        """
+        trie = cls()
+        trie.terms, trie.offsets, trie.ids = terms, offsets, ids
+        return trie
+
+    def __len__(self):
+        """Number of distinct words"""
+        self.compact()
+        return len(self.terms)
+
+    def __contains__(self, word):
+        if word in self._pending:
+            return True
+        i = self._find(word)
+        return i >= 0 and self._is_live(i)
+
     def insert(self, word, topic_id):
         """Insert a word into the trie with its associated topic ID"""
-        node = self.root
-        for char in word:
-            if char not in node.children:
-                node.children[char] = TrieNode()
-            node = node.children[char]
-        node.is_end_of_word = True
-        node.topic_ids.add(topic_id)
-    
+        removed = self._removed.get(word)
+        if removed and topic_id in removed:
+            self._unremove(word, topic_id)
+
+        topic_ids = self._pending.get(word)
+        if topic_ids is None:
+            topic_ids = self._pending[word] = set()
+            insort(self._pending_terms, word)
+        topic_ids.add(topic_id)
+        self._maybe_merge()
+
+    def remove(self, word, topic_id):
+        """Remove a topic ID from a word, dropping the word once it has none left"""
+        topic_ids = self._pending.get(word)
+        if topic_ids is not None and topic_id in topic_ids:
+            topic_ids.discard(topic_id)
+            if not topic_ids:
+                del self._pending[word]
+                del self._pending_terms[bisect_left(self._pending_terms, word)]
+
+        i = self._find(word)
+        if i >= 0:
+            start, end = self.offsets[i], self.offsets[i + 1]
+            position = bisect_left(self.ids, topic_id, start, end)
+            if position < end and self.ids[position] == topic_id:
+                removed = self._removed.setdefault(word, set())
+                if topic_id not in removed:
+                    removed.add(topic_id)
+                    self._removed_count += 1
+        self._maybe_merge()
+
+    def _unremove(self, word, topic_id):
+        removed = self._removed[word]
+        removed.discard(topic_id)
+        self._removed_count -= 1
+        if not removed:
+            del self._removed[word]
+
+    def _find(self, word):
+        """Index of word in the merged term list, or -1"""
+        i = bisect_left(self.terms, word)
+        return i if i < len(self.terms) and self.terms[i] == word else -1
+
+    def _is_live(self, i):
+        """Whether merged term i still has postings that are not tombstoned"""
+        removed = self._removed.get(self.terms[i])
+        return not removed or len(removed) < self.offsets[i + 1] - self.offsets[i]
+
+    def _maybe_merge(self):
+        threshold = max(MIN_MERGE_THRESHOLD, len(self.terms) // MERGE_RATIO)
+        if len(self._pending_terms) >= threshold or self._removed_count >= threshold:
+            self.compact()
+
+    def get(self, word):
+        """Return the topic IDs stored for exactly this word"""
+        topic_ids = set(self._pending.get(word, ()))
+        i = self._find(word)
+        if i >= 0:
+            topic_ids.update(self.ids[self.offsets[i]:self.offsets[i + 1]])
+            topic_ids.difference_update(self._removed.get(word, ()))
+        return topic_ids
+
     def search(self, prefix):
         """Return all topic IDs that contain the prefix"""
-        node = self.root
-        for char in prefix:
-            if char not in node.children:
-                return set()  # Prefix not found
-            node = node.children[char]
-        
-        # Collect all topic IDs from this node and its children
         topic_ids = set()
-        self._collect_topic_ids(node, topic_ids)
+        lo, hi = self._range(self.terms, prefix)
+        if lo < hi:
+            if any(word.startswith(prefix) for word in self._removed):
+                # Tombstones in range: subtract them term by term
+                for i in range(lo, hi):
+                    ids = self.ids[self.offsets[i]:self.offsets[i + 1]]
+                    removed = self._removed.get(self.terms[i])
+                    topic_ids.update(set(ids) - removed if removed else ids)
+            else:
+                topic_ids.update(self.ids[self.offsets[lo]:self.offsets[hi]])
+        lo, hi = self._range(self._pending_terms, prefix)
+        for word in self._pending_terms[lo:hi]:
+            topic_ids.update(self._pending[word])
         return topic_ids
-    
-    def _collect_topic_ids(self, node, topic_ids):
-        """Collect all topic IDs in the subtree rooted at node"""
-        if node.is_end_of_word:
-            topic_ids.update(node.topic_ids)
-        
-        for child in node.children.values():
-            self._collect_topic_ids(child, topic_ids)
\ No newline at end of file
+
+    def words_with_prefix(self, prefix, limit=50):
+        """Return up to `limit` indexed words starting with prefix, in sorted order"""
+        lo, hi = self._range(self.terms, prefix)
+        if self._removed:
+            words = []
+            while lo < hi and len(words) < limit:
+                if self._is_live(lo):
+                    words.append(self.terms[lo])
+                lo += 1
+        else:
+            words = self.terms[lo:min(hi, lo + limit)]
+        lo, hi = self._range(self._pending_terms, prefix)
+        if lo < hi:
+            words = sorted(set(words).union(self._pending_terms[lo:min(hi, lo + limit)]))[:limit]
+        return words
+
+    def _range(self, terms, prefix):
+        return bisect_left(terms, prefix), bisect_left(terms, _prefix_end(prefix))
+
+    def compact(self):
+        """Fold the write buffer and tombstones into the sorted term list and posting arrays"""
+        if not self._pending_terms and not self._removed:
+            return
+
+        old_terms, old_offsets, old_ids = self.terms, self.offsets, self.ids
+        terms, offsets, ids = [], array("I", [0]), array("I")
+        i = 0
+        for word in sorted(self._pending.keys() | self._removed.keys()):
+            # Copy the run of untouched words before `word` in bulk
+            j = bisect_left(old_terms, word, i)
+            if j > i:
+                shift = len(ids) - old_offsets[i]
+                terms.extend(old_terms[i:j])
+                ids.extend(old_ids[old_offsets[i]:old_offsets[j]])
+                offsets.extend(offset + shift for offset in old_offsets[i + 1:j + 1])
+                i = j
+
+            topic_ids = set(self._pending.get(word, ()))
+            if i < len(old_terms) and old_terms[i] == word:
+                topic_ids.update(old_ids[old_offsets[i]:old_offsets[i + 1]])
+                i += 1
+            topic_ids.difference_update(self._removed.get(word, ()))
+            if topic_ids:
+                terms.append(word)
+                ids.extend(sorted(topic_ids))
+                offsets.append(len(ids))
+
+        if i < len(old_terms):
+            shift = len(ids) - old_offsets[i]
+            terms.extend(old_terms[i:])
+            ids.extend(old_ids[old_offsets[i]:])
+            offsets.extend(offset + shift for offset in old_offsets[i + 1:])
+
+        self.terms, self.offsets, self.ids = terms, offsets, ids
+        self._pending_terms = []
+        self._pending = {}
+        self._removed = {}
+        self._removed_count = 0
@@ -0,0 +1,91 @@
+"""
+Measure how much the text analyzer shrinks the search index.
+
+Indexes the same synthetic forum corpus (inflected words, punctuation,
+stopwords, mixed case and accents) twice: once with the old
+``text.lower().split()`` tokenizer and once with the Analyzer. Reports
+vocabulary size, postings, index memory and the posting-list lengths a
+set of common queries has to touch.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_analyzer --topics 50000
+"""
+import argparse
+import gc
+import random
+import tracemalloc
+
+from app.utils.analyzer import Analyzer, ENGLISH_STOPWORDS
+from app.utils.inverted_index import InvertedIndex
+
+BASE_WORDS = """
+python rust java database query index server client thread process memory cache
+topic comment user forum search deploy docker redis socket token error bug fix
+release version feature test build compile render page layout style function
+class module package import export stream event queue message worker schedule
+""".split()
+INFLECTIONS = ["", "s", "ing", "ed", "er"]
+PUNCTUATION = ["", "", "", ",", ".", "!", "?", ":", "(", ")"]
+STOPWORDS = sorted(ENGLISH_STOPWORDS)
+COMMON_STOPWORDS = ["the", "a", "to", "of", "and", "is", "in", "it", "for", "on"]
+
+def make_text(rng, words):
+    tokens = []
+    for _ in range(words):
+        if rng.random() < 0.4:
+            # Like real text, a handful of stopwords dominate
+            word = rng.choice(COMMON_STOPWORDS if rng.random() < 0.7 else STOPWORDS)
+        else:
+            word = rng.choice(BASE_WORDS) + rng.choice(INFLECTIONS)
+        if rng.random() < 0.1:
+            word = word.capitalize()
+        if rng.random() < 0.01:
+            word = word.replace("e", "é")
+        punctuation = rng.choice(PUNCTUATION)
+        tokens.append("(" + word if punctuation == "(" else word + punctuation)
+    return " ".join(tokens)
+
+def build(tokenize, docs):
+    gc.collect()
+    tracemalloc.start()
+    index = InvertedIndex()
+    for doc_id, text in enumerate(docs, 1):
+        index.add_document(doc_id, tokenize(text))
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return index, memory
+
+def touched(index, tokenize, query):
+    return sum(index.document_frequency(term) for term in set(tokenize(query)))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--topics", type=int, default=50000)
+    parser.add_argument("--words-per-topic", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    docs = [make_text(rng, args.words_per_topic) for _ in range(args.topics)]
+    queries = ["the python server", "how to fix a bug", "Caching, threads and workers", "is it the database?"]
+
+    analyzer = Analyzer()
+    tokenizers = {
+        "split": lambda text: text.lower().split(),
+        "analyzer": analyzer.analyze,
+    }
+
+    # Postings touched per query = sum of document frequencies of its terms.
+    # Stopwords dominate this for split(); stemming can raise it for content
+    # words because inflections now share one posting list (better recall).
+    print(f"{'tokenizer':<10}{'terms':>10}{'postings':>12}{'memory MB':>12}  postings touched per query")
+    for name, tokenize in tokenizers.items():
+        index, memory = build(tokenize, docs)
+        postings = sum(len(p) for p in index.postings.values())
+        per_query = [touched(index, tokenize, query) for query in queries]
+        print(f"{name:<10}{len(index.postings):>10}{postings:>12}{memory / 2**20:>12.1f}  {per_query}")
+        del index
+
+if __name__ == "__main__":
+    main()
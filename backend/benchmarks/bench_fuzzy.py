@@ -0,0 +1,83 @@
+"""
+Benchmark typo-tolerant term lookup against a brute-force scan.
+
+Builds the trigram FuzzyIndex over N distinct terms, then looks up
+misspellings (one random edit or transposition of an indexed term) and
+reports latency percentiles and how often the original term is found.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_fuzzy --terms 1000000
+"""
+import argparse
+import random
+import string
+import time
+
+from app.utils.fuzzy import FuzzyIndex, bounded_distance, max_edits_for
+
+def make_terms(count, rng):
+    terms = set()
+    while len(terms) < count:
+        length = rng.randint(4, 12)
+        terms.add("".join(rng.choice(string.ascii_lowercase) for _ in range(length)))
+    return list(terms)
+
+def misspell(term, rng):
+    i = rng.randrange(len(term) - 1)
+    edit = rng.choice(["substitute", "insert", "delete", "transpose"])
+    if edit == "substitute":
+        return term[:i] + rng.choice(string.ascii_lowercase) + term[i + 1:]
+    if edit == "insert":
+        return term[:i] + rng.choice(string.ascii_lowercase) + term[i:]
+    if edit == "delete":
+        return term[:i] + term[i + 1:]
+    return term[:i] + term[i + 1] + term[i] + term[i + 2:]
+
+def brute_force(terms, query):
+    max_distance = max_edits_for(query)
+    return [term for term in terms if bounded_distance(query, term, max_distance) is not None]
+
+def percentiles(timings):
+    timings = sorted(timings)
+    return timings[len(timings) // 2], timings[max(0, int(len(timings) * 0.99) - 1)]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--terms", type=int, default=1000000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--brute-force-queries", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    terms = make_terms(args.terms, rng)
+
+    index = FuzzyIndex()
+    start = time.perf_counter()
+    for term in terms:
+        index.add(term)
+    print(f"indexed {len(terms)} terms in {time.perf_counter() - start:.1f}s")
+
+    originals = [rng.choice([t for t in rng.sample(terms, 50) if len(t) >= 5]) for _ in range(args.queries)]
+    queries = [misspell(term, rng) for term in originals]
+
+    timings, found = [], 0
+    for original, query in zip(originals, queries):
+        start = time.perf_counter()
+        matches = index.search(query)
+        timings.append((time.perf_counter() - start) * 1000)
+        found += any(term == original for term, _ in matches)
+    p50, p99 = percentiles(timings)
+    print(f"trigram index   p50 {p50:.2f} ms   p99 {p99:.2f} ms   recall {found / len(queries):.1%}")
+
+    timings = []
+    for query in queries[:args.brute_force_queries]:
+        start = time.perf_counter()
+        brute_force(terms, query)
+        timings.append((time.perf_counter() - start) * 1000)
+    p50, _ = percentiles(timings)
+    print(f"brute force     p50 {p50:.2f} ms   ({len(timings)} queries)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Compare the legacy Trie subtree search with the ranked inverted index.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_search --topics 500000
+"""
+import argparse
+import itertools
+import random
+import string
+import time
+
+from app.utils.trie import Trie
+from app.utils.inverted_index import InvertedIndex
+
+MAX_PREFIX_EXPANSIONS = 50
+
+def make_vocabulary(size, rng):
+    vocabulary = set()
+    while len(vocabulary) < size:
+        length = rng.randint(3, 10)
+        vocabulary.add("".join(rng.choice(string.ascii_lowercase) for _ in range(length)))
+    return sorted(vocabulary)
+
+def make_corpus(topics, vocabulary, words_per_topic, rng):
+    # Zipf-like term distribution so common words have long posting lists
+    cum_weights = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(len(vocabulary))))
+    for topic_id in range(1, topics + 1):
+        yield topic_id, rng.choices(vocabulary, cum_weights=cum_weights, k=words_per_topic)
+
+def legacy_search(trie, tokens, limit):
+    results = set()
+    for token in tokens:
+        results.update(trie.search(token))
+    return list(results)[:limit]
+
+def ranked_search(trie, index, tokens, limit, mode):
+    term_groups = [trie.words_with_prefix(token, MAX_PREFIX_EXPANSIONS) for token in tokens]
+    return index.search(term_groups, mode=mode, limit=limit)
+
+def timeit(fn, queries):
+    timings = []
+    for tokens in queries:
+        start = time.perf_counter()
+        fn(tokens)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2], timings[int(len(timings) * 0.99) - 1]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--topics", type=int, default=100000)
+    parser.add_argument("--vocabulary", type=int, default=50000)
+    parser.add_argument("--words-per-topic", type=int, default=30)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = make_vocabulary(args.vocabulary, rng)
+
+    trie = Trie()
+    index = InvertedIndex()
+    start = time.perf_counter()
+    for topic_id, words in make_corpus(args.topics, vocabulary, args.words_per_topic, rng):
+        for word in words:
+            trie.insert(word, topic_id)
+        index.add_document(topic_id, words)
+    print(f"indexed {args.topics} topics in {time.perf_counter() - start:.1f}s")
+
+    query_sets = {
+        "1-letter prefix": [[rng.choice(string.ascii_lowercase)] for _ in range(args.queries)],
+        "3-letter prefix": [[rng.choice(vocabulary)[:3]] for _ in range(args.queries)],
+        "2 full words": [rng.sample(vocabulary[:2000], 2) for _ in range(args.queries)],
+    }
+
+    print(f"{'query':<18}{'path':<14}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, queries in query_sets.items():
+        paths = {
+            "trie-union": lambda tokens: legacy_search(trie, tokens, args.limit),
+            "bm25-or": lambda tokens: ranked_search(trie, index, tokens, args.limit, "or"),
+            "bm25-and": lambda tokens: ranked_search(trie, index, tokens, args.limit, "and"),
+        }
+        for path, fn in paths.items():
+            p50, p99 = timeit(fn, queries)
+            print(f"{name:<18}{path:<14}{p50:>10.2f}{p99:>10.2f}")
+
+if __name__ == "__main__":
+    main()
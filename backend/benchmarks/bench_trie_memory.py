@@ -0,0 +1,94 @@
+"""
+Measure the memory footprint of the prefix index.
+
+Builds the compact Trie with N distinct terms and reports the Python heap
+it holds (tracemalloc). Pass --legacy to build the old one-node-per-character
+trie with the same terms for comparison (slow and several GB at 1M terms).
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_trie_memory --terms 1000000
+"""
+import argparse
+import gc
+import random
+import string
+import time
+import tracemalloc
+
+from app.utils.trie import Trie
+
+class LegacyTrieNode:
+    def __init__(self):
+        self.children = {}
+        self.is_end_of_word = False
+        self.topic_ids = set()
+
+class LegacyTrie:
+    def __init__(self):
+        self.root = LegacyTrieNode()
+
+    def insert(self, word, topic_id):
+        node = self.root
+        for char in word:
+            if char not in node.children:
+                node.children[char] = LegacyTrieNode()
+            node = node.children[char]
+        node.is_end_of_word = True
+        node.topic_ids.add(topic_id)
+
+def make_postings(terms, postings_per_term, topics, rng):
+    vocabulary = set()
+    while len(vocabulary) < terms:
+        length = rng.randint(4, 12)
+        vocabulary.add("".join(rng.choice(string.ascii_lowercase) for _ in range(length)))
+    return [(word, rng.randint(1, topics)) for word in vocabulary for _ in range(postings_per_term)]
+
+def measure(factory, postings):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    trie = factory()
+    for word, topic_id in postings:
+        # Fresh string objects, as the tokenizer would produce
+        trie.insert(word.encode().decode(), topic_id)
+    if hasattr(trie, "compact"):
+        trie.compact()
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return trie, elapsed, current, peak
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--terms", type=int, default=1000000)
+    parser.add_argument("--postings-per-term", type=int, default=3)
+    parser.add_argument("--topics", type=int, default=500000)
+    parser.add_argument("--legacy", action="store_true", help="also measure the per-character node trie")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    postings = make_postings(args.terms, args.postings_per_term, args.topics, rng)
+    print(f"{args.terms} distinct terms, {len(postings)} postings")
+
+    factories = {"compact": Trie}
+    if args.legacy:
+        factories["legacy"] = LegacyTrie
+
+    print(f"{'trie':<10}{'build s':>10}{'resident MB':>14}{'peak MB':>10}{'search us':>12}")
+    for name, factory in factories.items():
+        trie, elapsed, current, peak = measure(factory, postings)
+        search_us = ""
+        if hasattr(trie, "search"):
+            prefixes = [rng.choice(postings)[0][:3] for _ in range(1000)]
+            start = time.perf_counter()
+            for prefix in prefixes:
+                trie.search(prefix)
+            search_us = f"{(time.perf_counter() - start) / len(prefixes) * 1e6:.1f}"
+        print(f"{name:<10}{elapsed:>10.1f}{current / 2**20:>14.1f}{peak / 2**20:>10.1f}{search_us:>12}")
+        del trie
+        gc.collect()
+
+if __name__ == "__main__":
+    main()
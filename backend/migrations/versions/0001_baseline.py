@@ -0,0 +1,84 @@
+"""Baseline schema (the tables create_all used to make)
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-17 09:00:00
+
+Databases created by Base.metadata.create_all already have these tables;
+they are skipped, so such databases can simply be upgraded.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "users" not in existing:
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("username", sa.String()),
+            sa.Column("email", sa.String()),
+            sa.Column("hashed_password", sa.String()),
+            sa.Column("bio", sa.String(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("updated_at", sa.DateTime(timezone=True)),
+            sa.Column("is_active", sa.Boolean()),
+        )
+        op.create_index("ix_users_id", "users", ["id"])
+        op.create_index("ix_users_username", "users", ["username"], unique=True)
+        op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    if "topics" not in existing:
+        op.create_table(
+            "topics",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("title", sa.String()),
+            sa.Column("content", sa.Text()),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id")),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("updated_at", sa.DateTime(timezone=True)),
+            sa.Column("view_count", sa.Integer()),
+        )
+        op.create_index("ix_topics_id", "topics", ["id"])
+        op.create_index("ix_topics_title", "topics", ["title"])
+
+    if "comments" not in existing:
+        op.create_table(
+            "comments",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("content", sa.Text()),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id")),
+            sa.Column("topic_id", sa.Integer(), sa.ForeignKey("topics.id")),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("updated_at", sa.DateTime(timezone=True)),
+        )
+        op.create_index("ix_comments_id", "comments", ["id"])
+
+    if "notifications" not in existing:
+        op.create_table(
+            "notifications",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id")),
+            sa.Column("message", sa.String()),
+            sa.Column("topic_id", sa.Integer(), sa.ForeignKey("topics.id"), nullable=True),
+            sa.Column("comment_id", sa.Integer(), sa.ForeignKey("comments.id"), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("is_read", sa.Boolean()),
+        )
+        op.create_index("ix_notifications_id", "notifications", ["id"])
+
+
+def downgrade() -> None:
+    op.drop_table("notifications")
+    op.drop_table("comments")
+    op.drop_table("topics")
+    op.drop_table("users")
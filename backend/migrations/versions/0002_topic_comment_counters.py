@@ -0,0 +1,42 @@
+"""Denormalized comments_count and last_activity_at on topics
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 09:30:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+# Same statement as app.services.counter_service.RECONCILE_TOPIC_COUNTERS,
+# copied so this revision keeps working when the app code changes
+BACKFILL = """
+UPDATE topics SET
+    comments_count = (SELECT count(*) FROM comments WHERE comments.topic_id = topics.id),
+    last_activity_at = coalesce(
+        (SELECT max(comments.created_at) FROM comments WHERE comments.topic_id = topics.id),
+        topics.created_at
+    )
+"""
+
+
+def upgrade() -> None:
+    columns = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("topics")}
+    if "comments_count" not in columns:
+        op.add_column("topics", sa.Column("comments_count", sa.Integer(), nullable=False, server_default="0"))
+    if "last_activity_at" not in columns:
+        op.add_column("topics", sa.Column("last_activity_at", sa.DateTime(timezone=True), nullable=True))
+    op.execute(BACKFILL)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("topics") as batch_op:
+        batch_op.drop_column("last_activity_at")
+        batch_op.drop_column("comments_count")
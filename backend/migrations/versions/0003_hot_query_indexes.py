@@ -0,0 +1,59 @@
+"""Indexes for the hot listing queries
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 10:00:00
+
+Every paginated listing orders by (created_at, id), so each index ends
+with those columns and serves both the first page and keyset pages:
+
+  topics          ORDER BY created_at DESC, id DESC
+  comments        WHERE topic_id = ? ORDER BY created_at, id
+  notifications   WHERE user_id = ? ORDER BY created_at DESC, id DESC
+  notifications   WHERE user_id = ? AND NOT is_read  (partial index)
+
+On PostgreSQL the indexes are built CONCURRENTLY so a live database keeps
+accepting writes.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_topics_created_at_id", "topics", ["created_at", "id"], None),
+    ("ix_comments_topic_id_created_at_id", "comments", ["topic_id", "created_at", "id"], None),
+    ("ix_notifications_user_id_created_at_id", "notifications", ["user_id", "created_at", "id"], None),
+    ("ix_notifications_user_id_unread", "notifications", ["user_id"], "is_read = false"),
+]
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    existing = {
+        index["name"]
+        for table in {table for _, table, _, _ in INDEXES}
+        for index in sa.inspect(bind).get_indexes(table)
+    }
+    postgres = bind.dialect.name == "postgresql"
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            if name in existing:
+                continue
+            op.create_index(
+                name, table, columns,
+                postgresql_concurrently=postgres,
+                postgresql_where=sa.text(where) if where else None,
+                sqlite_where=sa.text(where) if where else None,
+            )
+
+
+def downgrade() -> None:
+    for name, table, _, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,159 @@
+"""
+Check that the hot queries are served by indexes, not sequential scans.
+
+Runs EXPLAIN (FORMAT JSON) for the listing queries the API issues (first
+pages and keyset pages of topics, topic comments and notifications, plus
+the mark-all-read update) and fails if any plan contains a Seq Scan on
+one of their tables. PostgreSQL only; plans on a near-empty database are
+meaningless, so point it at a scratch database and seed it first:
+
+Run from the backend directory:
+
+    alembic upgrade head
+    python -m scripts.check_query_plans --seed
+"""
+import argparse
+import sys
+
+from sqlalchemy import create_engine, text
+
+from app.config import settings
+
+SEED = [
+    """
+    INSERT INTO users (username, email, hashed_password, is_active)
+    SELECT 'plan_user_' || i, 'plan_user_' || i || '@example.com', '', true
+    FROM generate_series(1, :users) AS i
+    ON CONFLICT DO NOTHING
+    """,
+    """
+    INSERT INTO topics (title, content, user_id, created_at, view_count, comments_count, last_activity_at)
+    SELECT 'Topic ' || i, 'Content ' || i, u.min_id + i % :users,
+           now() - i * interval '1 minute', 0, 0, now() - i * interval '1 minute'
+    FROM generate_series(1, :topics) AS i, (SELECT min(id) AS min_id FROM users) AS u
+    """,
+    """
+    INSERT INTO comments (content, user_id, topic_id, created_at)
+    SELECT 'Comment ' || i, u.min_id + i % :users, t.min_id + (i * 7919) % :topics,
+           now() - i * interval '1 second'
+    FROM generate_series(1, :comments) AS i,
+         (SELECT min(id) AS min_id FROM users) AS u,
+         (SELECT min(id) AS min_id FROM topics) AS t
+    """,
+    """
+    INSERT INTO notifications (user_id, message, created_at, is_read)
+    SELECT u.min_id + i % :users, 'Notification ' || i, now() - i * interval '1 second', i % 10 <> 0
+    FROM generate_series(1, :notifications) AS i, (SELECT min(id) AS min_id FROM users) AS u
+    """,
+]
+
+# Parameters are taken from existing rows, deep into each listing
+SAMPLE = """
+SELECT
+    (SELECT topic_id FROM comments GROUP BY topic_id ORDER BY count(*) DESC LIMIT 1) AS topic_id,
+    (SELECT user_id FROM notifications GROUP BY user_id ORDER BY count(*) DESC LIMIT 1) AS user_id,
+    (SELECT created_at FROM topics ORDER BY created_at DESC, id DESC OFFSET 5000 LIMIT 1) AS topic_created_at,
+    (SELECT id FROM topics ORDER BY created_at DESC, id DESC OFFSET 5000 LIMIT 1) AS topic_row_id
+"""
+SAMPLE_ROWS = """
+SELECT
+    (SELECT created_at FROM comments WHERE topic_id = :topic_id ORDER BY created_at, id OFFSET 20 LIMIT 1) AS comment_created_at,
+    (SELECT id FROM comments WHERE topic_id = :topic_id ORDER BY created_at, id OFFSET 20 LIMIT 1) AS comment_row_id,
+    (SELECT created_at FROM notifications WHERE user_id = :user_id ORDER BY created_at DESC, id DESC OFFSET 20 LIMIT 1) AS notification_created_at,
+    (SELECT id FROM notifications WHERE user_id = :user_id ORDER BY created_at DESC, id DESC OFFSET 20 LIMIT 1) AS notification_row_id
+"""
+
+QUERIES = {
+    "topics: first page": (
+        "SELECT * FROM topics ORDER BY created_at DESC, id DESC LIMIT 11"
+    ),
+    "topics: keyset page": (
+        "SELECT * FROM topics WHERE (created_at, id) < (:topic_created_at, :topic_row_id) "
+        "ORDER BY created_at DESC, id DESC LIMIT 11"
+    ),
+    "comments: first page of a topic": (
+        "SELECT * FROM comments WHERE topic_id = :topic_id ORDER BY created_at, id LIMIT 51"
+    ),
+    "comments: keyset page of a topic": (
+        "SELECT * FROM comments WHERE topic_id = :topic_id AND (created_at, id) > (:comment_created_at, :comment_row_id) "
+        "ORDER BY created_at, id LIMIT 51"
+    ),
+    "notifications: first page of a user": (
+        "SELECT * FROM notifications WHERE user_id = :user_id ORDER BY created_at DESC, id DESC LIMIT 21"
+    ),
+    "notifications: keyset page of a user": (
+        "SELECT * FROM notifications WHERE user_id = :user_id "
+        "AND (created_at, id) < (:notification_created_at, :notification_row_id) "
+        "ORDER BY created_at DESC, id DESC LIMIT 21"
+    ),
+    "notifications: mark all read": (
+        "UPDATE notifications SET is_read = true WHERE user_id = :user_id AND is_read = false"
+    ),
+}
+
+TABLES = {"users", "topics", "comments", "notifications"}
+
+def seq_scans(plan):
+    """Tables read with a sequential scan anywhere in a plan tree"""
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in TABLES:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(seq_scans(child))
+    return found
+
+def seed(connection, args):
+    params = {
+        "users": args.users,
+        "topics": args.topics,
+        "comments": args.comments,
+        "notifications": args.notifications
+    }
+    for statement in SEED:
+        connection.execute(text(statement), params)
+    connection.commit()
+    connection.execute(text("ANALYZE users, topics, comments, notifications"))
+    connection.commit()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--seed", action="store_true", help="insert a synthetic dataset first (scratch databases only)")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--topics", type=int, default=50000)
+    parser.add_argument("--comments", type=int, default=500000)
+    parser.add_argument("--notifications", type=int, default=200000)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    if engine.dialect.name != "postgresql":
+        print(f"Query plan check needs PostgreSQL, not {engine.dialect.name}")
+        return 2
+
+    failures = 0
+    with engine.connect() as connection:
+        if args.seed:
+            seed(connection, args)
+        params = dict(connection.execute(text(SAMPLE)).mappings().one())
+        if None not in params.values():
+            params.update(connection.execute(text(SAMPLE_ROWS), params).mappings().one())
+        if None in params.values():
+            print("Not enough data to check plans; run with --seed on a scratch database")
+            return 2
+
+        for name, query in QUERIES.items():
+            # Plain EXPLAIN only plans the statement, so the UPDATE is not executed
+            plan = connection.execute(text(f"EXPLAIN (FORMAT JSON) {query}"), params).scalar()[0]["Plan"]
+            scans = seq_scans(plan)
+            status = f"SEQ SCAN on {', '.join(scans)}" if scans else "ok"
+            print(f"{name:40} {plan['Node Type']:20} cost={plan['Total Cost']:<10} {status}")
+            failures += bool(scans)
+        connection.rollback()
+
+    if failures:
+        print(f"{failures} hot queries fall back to sequential scans")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""
+Test configuration: a throwaway SQLite database, and an in-memory Redis
+(fakeredis) standing in for every Redis client the app creates. Settings
+are read from the environment at import time, so this runs before any
+app module is imported.
+"""
+import inspect
+import os
+import sys
+import tempfile
+from unittest import mock
+
+import fakeredis
+import fakeredis.aioredis
+import pytest
+import redis
+import redis.asyncio
+
+_tmp = tempfile.mkdtemp(prefix="forum-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp}/test.db"
+os.environ["ASYNC_DATABASE_URL"] = ""
+os.environ["RUN_MIGRATIONS_ON_STARTUP"] = "False"
+os.environ["SEARCH_CHANGE_FEED"] = "False"
+os.environ["SEARCH_SNAPSHOT_PATH"] = f"{_tmp}/search_index.snapshot"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+redis_server = fakeredis.FakeServer()
+
+class _FakeRedis(fakeredis.FakeRedis):
+    def __init__(self, *args, **kwargs):
+        kwargs["server"] = redis_server
+        super().__init__(*args, **kwargs)
+
+class _FakeAsyncRedis(fakeredis.aioredis.FakeRedis):
+    def __init__(self, *args, **kwargs):
+        kwargs["server"] = redis_server
+        super().__init__(*args, **kwargs)
+
+# fakeredis reads redis.Redis's signature to sort out its arguments
+# (decode_responses among them), so the stand-in must keep it
+_FakeRedis.__init__.__signature__ = inspect.signature(redis.Redis.__init__)
+
+redis.Redis = redis.StrictRedis = _FakeRedis
+redis.asyncio.Redis = redis.asyncio.StrictRedis = _FakeAsyncRedis
+
+# notification_service connects to RabbitMQ at import time
+import pika  # noqa: E402
+pika.BlockingConnection = mock.MagicMock()
+
+@pytest.fixture(autouse=True)
+def clean_redis():
+    yield
+    redis.Redis().flushall()
+
+@pytest.fixture
+def db():
+    """Fresh tables, and a sync session on them"""
+    from app.models import Base, SessionLocal, engine
+    from app.models import user, topic, comment, notification  # noqa: F401
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+@pytest.fixture
+def client(db):
+    """TestClient for the app; startup hooks (bootstrap, background threads) don't run"""
+    from fastapi.testclient import TestClient
+    from app.main import app
+    return TestClient(app)
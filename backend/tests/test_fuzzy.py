@@ -0,0 +1,48 @@
+from app.utils.fuzzy import FuzzyIndex, bounded_distance, max_edits_for, trigrams
+
+def make_index(*terms):
+    index = FuzzyIndex()
+    for term in terms:
+        index.add(term)
+    return index
+
+def test_trigrams_are_padded_and_distinct():
+    assert trigrams("aaa") == ["$aa", "aaa", "aa$"]
+
+def test_bounded_distance():
+    assert bounded_distance("python", "python", 1) == 0
+    assert bounded_distance("pythn", "python", 1) == 1
+    assert bounded_distance("pyhton", "python", 1) == 1  # adjacent transposition
+    assert bounded_distance("pyth", "python", 1) is None
+    assert bounded_distance("kitten", "sitting", 3) == 3
+
+def test_edit_budget_grows_with_length():
+    assert max_edits_for("cat") == 0
+    assert max_edits_for("rust") == 1
+    assert max_edits_for("pythn") == 1
+    assert max_edits_for("packaging") == 1
+    assert max_edits_for("distribution") == 2
+
+def test_five_letter_typo_finds_the_word():
+    index = make_index("python", "pytest", "rust", "pythons")
+    assert index.search("pythn") == [("python", 1)]
+
+def test_four_letter_queries_allow_one_edit():
+    index = make_index("rust", "trust", "crust", "dust")
+    assert [term for term, _ in index.search("rusr")] == ["rust"]
+    assert index.search("rusty") == [("rust", 1)]
+
+def test_three_letter_queries_match_exactly():
+    index = make_index("cat", "car", "cut")
+    assert index.search("cat") == [("cat", 0)]
+    assert index.search("cap") == []
+
+def test_results_are_closest_first_and_limited():
+    index = make_index("distribution", "distributions", "distributing", "attribution")
+    assert index.search("distribution", limit=2) == [("distribution", 0), ("distributions", 1)]
+
+def test_rebuild_drops_dead_terms():
+    index = make_index("python", "pythons")
+    index.rebuild(["pythons"])
+    assert len(index) == 1
+    assert index.search("python") == [("pythons", 1)]
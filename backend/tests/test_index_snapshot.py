@@ -0,0 +1,77 @@
+import os
+import threading
+from array import array
+
+import pytest
+
+from app.utils.index_snapshot import SnapshotError, SnapshotReader, encode_strings, write_snapshot
+
+def _sections(value):
+    # Every section encodes the same value, so a mixed file is detectable
+    return {
+        "numbers": array("I", [value] * 1000),
+        "label": encode_strings([f"v{value}"] * 100),
+    }
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "index.snapshot")
+    write_snapshot(path, _sections(7), high_water=123.5)
+
+    reader = SnapshotReader(path)
+    assert reader.high_water == 123.5
+    assert set(reader.array("numbers", "I")) == {7}
+    assert reader.strings("label") == ["v7"] * 100
+    assert os.listdir(tmp_path) == ["index.snapshot"]
+
+def test_corruption_is_rejected(tmp_path):
+    path = str(tmp_path / "index.snapshot")
+    write_snapshot(path, _sections(7), high_water=1.0)
+    data = bytearray(open(path, "rb").read())
+    data[len(data) // 2] ^= 0xFF
+    open(path, "wb").write(data)
+
+    with pytest.raises(SnapshotError, match="checksum"):
+        SnapshotReader(path)
+
+def test_truncation_is_rejected(tmp_path):
+    path = str(tmp_path / "index.snapshot")
+    write_snapshot(path, _sections(7), high_water=1.0)
+    data = open(path, "rb").read()
+    open(path, "wb").write(data[:-8])
+
+    with pytest.raises(SnapshotError):
+        SnapshotReader(path)
+
+def test_concurrent_writers_never_produce_a_mixed_file(tmp_path):
+    path = str(tmp_path / "index.snapshot")
+    write_snapshot(path, _sections(0), high_water=0.0)
+    errors = []
+    stop = threading.Event()
+
+    def writer(worker):
+        try:
+            for i in range(30):
+                value = worker * 1000 + i
+                write_snapshot(path, _sections(value), high_water=float(value))
+        except Exception as e:
+            errors.append(e)
+
+    def reader():
+        while not stop.is_set():
+            snapshot = SnapshotReader(path)
+            value = int(snapshot.high_water)
+            if set(snapshot.array("numbers", "I")) != {value} or snapshot.strings("label")[0] != f"v{value}":
+                errors.append(AssertionError(f"mixed snapshot at high_water={value}"))
+
+    readers = [threading.Thread(target=reader) for _ in range(2)]
+    writers = [threading.Thread(target=writer, args=(worker,)) for worker in range(4)]
+    for thread in readers + writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    stop.set()
+    for thread in readers:
+        thread.join()
+
+    assert errors == []
+    assert os.listdir(tmp_path) == ["index.snapshot"]
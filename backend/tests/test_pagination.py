@@ -0,0 +1,86 @@
+from app.models.comment import Comment
+from app.models.topic import Topic
+from app.models.user import User
+
+TOPICS_QUERY = """
+query Topics($first: Int, $after: String, $last: Int, $before: String) {
+  topics(first: $first, after: $after, last: $last, before: $before) {
+    edges { node { id } }
+    pageInfo { hasNextPage hasPreviousPage startCursor endCursor }
+  }
+}
+"""
+
+def seed(db, topics=7, comments=7):
+    # Inserted in a tight loop, so most rows share a created_at second
+    user = User(username="alice", email="alice@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    topic_rows = [Topic(title=f"Topic {i}", content="", user_id=user.id) for i in range(topics)]
+    db.add_all(topic_rows)
+    db.commit()
+    comment_rows = [Comment(content=f"Comment {i}", user_id=user.id, topic_id=topic_rows[0].id) for i in range(comments)]
+    db.add_all(comment_rows)
+    db.commit()
+    return [topic.id for topic in topic_rows], [comment.id for comment in comment_rows]
+
+def walk(client, url, header):
+    """IDs of every page reached by following `header` from url"""
+    pages = []
+    while url:
+        assert len(pages) < 20, f"paging does not terminate: {pages[:4]}"
+        response = client.get(url)
+        assert response.status_code == 200
+        pages.append([row["id"] for row in response.json()])
+        cursor = response.headers.get(header)
+        url = f"{url.split('cursor=')[0].rstrip('&?')}&cursor={cursor}" if cursor else None
+    return pages
+
+def test_rest_topics_pages_cover_every_row_once(client, db):
+    topic_ids, _ = seed(db)
+
+    pages = walk(client, "/api/topics/?limit=3", "X-Next-Cursor")
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert sum(pages, []) == sorted(topic_ids, reverse=True)
+
+def test_rest_prev_cursor_walks_back(client, db):
+    topic_ids, _ = seed(db)
+    forward = walk(client, "/api/topics/?limit=3", "X-Next-Cursor")
+
+    last = client.get("/api/topics/?limit=3")
+    for _ in range(len(forward) - 1):
+        last = client.get(f"/api/topics/?limit=3&cursor={last.headers['X-Next-Cursor']}")
+    backward = walk(client, f"/api/topics/?limit=3&cursor={last.headers['X-Prev-Cursor']}", "X-Prev-Cursor")
+    assert backward == forward[-2::-1]
+
+def test_rest_comment_pages_cover_every_row_once(client, db):
+    topic_ids, comment_ids = seed(db)
+
+    pages = walk(client, f"/api/comments/topic/{topic_ids[0]}?limit=2", "X-Next-Cursor")
+    assert [len(page) for page in pages] == [2, 2, 2, 1]
+    assert sum(pages, []) == comment_ids
+
+def graphql_topics(client, **variables):
+    response = client.post("/graphql", json={"query": TOPICS_QUERY, "variables": variables})
+    body = response.json()
+    assert "errors" not in body, body
+    return body["data"]["topics"]
+
+def test_graphql_connection_pages_cover_every_row_once(client, db):
+    topic_ids, _ = seed(db)
+
+    seen, after = [], None
+    while len(seen) < 20:
+        connection = graphql_topics(client, first=3, after=after)
+        seen.extend(int(edge["node"]["id"]) for edge in connection["edges"])
+        if not connection["pageInfo"]["hasNextPage"]:
+            break
+        after = connection["pageInfo"]["endCursor"]
+    assert seen == sorted(topic_ids, reverse=True)
+
+    seen, before = [], after
+    while before and len(seen) < 20:
+        connection = graphql_topics(client, last=3, before=before)
+        seen = [int(edge["node"]["id"]) for edge in connection["edges"]] + seen
+        before = connection["pageInfo"]["startCursor"] if connection["pageInfo"]["hasPreviousPage"] else None
+    assert seen == sorted(topic_ids, reverse=True)[:6]
@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta
+import threading
+from types import SimpleNamespace
+
+import pytest
+import redis
+
+from app.services.search_service import SNAPSHOT_LOCK_KEY, SearchService
+
+NOW = datetime(2024, 1, 1, 12, 0, 0)
+
+def make_topic(topic_id, title, content="", minutes_ago=0):
+    return SimpleNamespace(
+        id=topic_id,
+        title=title,
+        content=content,
+        view_count=0,
+        created_at=NOW - timedelta(minutes=minutes_ago),
+        updated_at=None
+    )
+
+def make_comment(comment_id, topic_id, content):
+    return SimpleNamespace(id=comment_id, topic_id=topic_id, content=content)
+
+@pytest.fixture
+def service():
+    service = SearchService()
+    service.initialize([
+        make_topic(1, "Python packaging guide", "wheels and sdists"),
+        make_topic(2, "Rust ownership explained", "borrowing and lifetimes"),
+        make_topic(3, "Python async patterns", "asyncio event loops"),
+    ])
+    return service
+
+def test_snapshot_round_trip(service, tmp_path):
+    path = str(tmp_path / "search.snapshot")
+    assert service.save_snapshot(path)
+
+    restored = SearchService()
+    assert restored.load_snapshot(path)
+    assert restored.high_water == service.high_water
+    assert sorted(restored.index.search([["python"]], limit=10)) == sorted(service.index.search([["python"]], limit=10))
+
+def test_only_the_lock_holder_writes_the_snapshot(service, tmp_path):
+    path = str(tmp_path / "search.snapshot")
+    redis.Redis().set(SNAPSHOT_LOCK_KEY, "another-worker")
+
+    assert service.save_snapshot(path) is False
+    assert not (tmp_path / "search.snapshot").exists()
+
+def test_searches_are_safe_while_the_change_feed_mutates_the_index(service, monkeypatch):
+    # Bypass the result cache so every search walks the live index
+    monkeypatch.setattr(
+        "app.services.search_service.result_cache.get_or_compute",
+        lambda key, compute, ttl, stale_ttl=0: compute()
+    )
+    errors = []
+    done = threading.Event()
+
+    def mutate():
+        try:
+            for i in range(300):
+                topic_id = 100 + i % 20
+                service.apply_change({"origin": "other", "op": "upsert", "topic": {
+                    "id": topic_id, "title": f"Python topic {i}", "content": f"word{i} concurrency",
+                    "view_count": 0, "created_at": NOW.isoformat(), "updated_at": None
+                }})
+                service.apply_change({"origin": "other", "op": "comment_upsert", "comment": {
+                    "id": 1000 + i, "topic_id": topic_id, "content": f"python reply {i}"
+                }})
+                if i % 3 == 0:
+                    service.apply_change({"origin": "other", "op": "remove", "id": topic_id})
+        except Exception as e:
+            errors.append(e)
+        finally:
+            done.set()
+
+    def search():
+        try:
+            while not done.is_set():
+                service.search("python", fuzzy=True)
+                service.search_with_comments("python reply", fuzzy=True)
+                service.suggest("pyth")
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=mutate)] + [threading.Thread(target=search) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+
+def test_fuzzy_search_tolerates_a_typo_in_a_short_word(service):
+    assert service.search("pythn") == []
+    assert sorted(service.search("pythn", fuzzy=True)) == [1, 3]
+
+def test_fuzzy_search_reaches_words_only_found_in_comments(service):
+    service.add_comment(make_comment(1, 2, "the borrow checker rejects my closure"), publish=False)
+
+    hits = service.search_with_comments("closre", fuzzy=True)
+    assert hits == [(2, 1)]
+
+def test_fuzzy_search_ignores_terms_that_left_the_dictionary(service):
+    service.remove_topic(2, publish=False)
+
+    assert service._expand(["ownershp"], service.trie, service.fuzzy, True) == [[]]
+    assert service.search("ownershp", fuzzy=True) == []
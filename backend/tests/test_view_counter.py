@@ -0,0 +1,55 @@
+import redis
+
+from app.models.topic import Topic
+from app.services.view_counter import FLUSH_LOCK_KEY, FLUSHING_KEY, PENDING_KEY, ViewCounter
+
+def make_topic(db, title="Topic"):
+    topic = Topic(title=title, content="", view_count=3)
+    db.add(topic)
+    db.commit()
+    return topic
+
+def test_views_accumulate_in_redis_until_flushed(db):
+    topic = make_topic(db)
+    counter = ViewCounter(interval_seconds=1)
+
+    assert counter.record(topic.id) == 1
+    assert counter.record(topic.id) == 2
+    assert counter.pending([topic.id]) == {topic.id: 2}
+    db.refresh(topic)
+    assert topic.view_count == 3
+
+    assert counter.flush() == 2
+    db.refresh(topic)
+    assert topic.view_count == 5
+    assert counter.pending([topic.id]) == {topic.id: 0}
+
+def test_flush_finishes_a_batch_left_by_a_crashed_flusher(db):
+    topic = make_topic(db)
+    client = redis.Redis(decode_responses=True)
+    client.hset(FLUSHING_KEY, topic.id, 4)
+    client.hset(PENDING_KEY, topic.id, 1)
+    counter = ViewCounter(interval_seconds=1)
+
+    assert counter.flush() == 4
+    assert counter.flush() == 1
+    db.refresh(topic)
+    assert topic.view_count == 8
+
+def test_only_one_flusher_at_a_time(db):
+    topic = make_topic(db)
+    client = redis.Redis(decode_responses=True)
+    client.set(FLUSH_LOCK_KEY, "another-worker")
+    counter = ViewCounter(interval_seconds=1)
+    counter.record(topic.id)
+
+    assert counter.flush() == 0
+    # The other worker's lock is left alone
+    assert client.get(FLUSH_LOCK_KEY) == "another-worker"
+
+def test_flush_releases_its_lock(db):
+    counter = ViewCounter(interval_seconds=1)
+    counter.record(make_topic(db).id)
+
+    assert counter.flush() == 1
+    assert not redis.Redis().exists(FLUSH_LOCK_KEY)